@@ -1,6 +1,4 @@
 import numpy as np
-from casadi import MX
-import biorbd
 
 
 class BiorbdInterface:
@@ -11,9 +9,10 @@ class BiorbdInterface:
                 "f_ext should be a list of (6 x nb_external_forces x nb_shooting) or (6 x nb_shooting) matrix"
             )
 
-        sv_over_all_phases = []
+        f_ext_over_all_phases = []
         for f_ext in all_f_ext:
-            f_ext = np.array(f_ext)
+            # The values are only read node by node, so a broadcast array is kept as is instead of being copied
+            f_ext = np.asarray(f_ext)
             if len(f_ext.shape) < 2 or len(f_ext.shape) > 3:
                 raise RuntimeError(
                     "f_ext should be a list of (6 x nb_external_forces x nb_shooting) or (6 x nb_shooting) matrix"
@@ -26,12 +25,7 @@ class BiorbdInterface:
                     "f_ext should be a list of (6 x nb_external_forces x nb_shooting) or (6 x nb_shooting) matrix"
                 )
 
-            sv_over_phase = []
-            for node in range(f_ext.shape[2]):
-                sv = biorbd.VecBiorbdSpatialVector()
-                for idx in range(f_ext.shape[1]):
-                    sv.append(biorbd.SpatialVector(MX(f_ext[:, idx, node])))
-                sv_over_phase.append(sv)
-            sv_over_all_phases.append(sv_over_phase)
+            # The spatial vectors are built symbolically once by the dynamics, only the values are kept per node
+            f_ext_over_all_phases.append([f_ext[:, :, node] for node in range(f_ext.shape[2])])
 
-        return sv_over_all_phases
+        return f_ext_over_all_phases
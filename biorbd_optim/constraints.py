@@ -1,7 +1,8 @@
 from math import inf
 from enum import Enum
 
-from casadi import vertcat, sum1, horzcat
+import numpy as np
+from casadi import sum1, horzcat
 
 from .enums import Instant, InterpolationType
 from .penalty import PenaltyType, PenaltyFunctionAbstract
@@ -112,10 +113,11 @@ class ConstraintFunction(PenaltyFunctionAbstract):
         # Dynamics must be sound within phases
         for i, nlp in enumerate(ocp.nlp):
             penalty_idx = ConstraintFunction._reset_penalty(ocp, None, -1)
-            # Loop over shooting nodes or use parallelization
-            if ocp.nb_threads > 1:
-                end_nodes = nlp["par_dynamics"](horzcat(*nlp["X"][:-1]), horzcat(*nlp["U"]))
-                vals = horzcat(*nlp["X"][1:]) - end_nodes
+            # Integrate all the shooting nodes at once when they share the same dynamics, otherwise loop over them
+            if nlp["par_dynamics"] is not None:
+                # The inputs are named, since integrators other than RK take more than the states and controls
+                end_nodes = nlp["par_dynamics"](x0=horzcat(*nlp["X"][:-1]), p=horzcat(*nlp["U"]))["xf"]
+                vals = end_nodes - horzcat(*nlp["X"][1:])
                 ConstraintFunction._add_to_penalty(ocp, None, vals.reshape((nlp["nx"] * nlp["ns"], 1)), penalty_idx)
             else:
                 for k in range(nlp["ns"]):
@@ -146,9 +148,9 @@ class ConstraintFunction(PenaltyFunctionAbstract):
 
     @staticmethod
     def _add_to_penalty(ocp, nlp, g, penalty_idx, min_bound=0, max_bound=0, **extra_param):
-        g_bounds = Bounds(interpolation_type=InterpolationType.CONSTANT)
-        for _ in range(g.rows()):
-            g_bounds.concatenate(Bounds(min_bound, max_bound, interpolation_type=InterpolationType.CONSTANT))
+        g_bounds = Bounds(
+            np.full(g.rows(), min_bound), np.full(g.rows(), max_bound), interpolation_type=InterpolationType.CONSTANT
+        )
 
         if nlp:
             nlp["g"][penalty_idx].append(g)
@@ -184,11 +186,8 @@ class ConstraintFunction(PenaltyFunctionAbstract):
     def _span_checker(constraint_function, instant, nlp):
         # Everything that is suspicious in terms of the span of the penalty function ca be checked here
         super(ConstraintFunction, ConstraintFunction)._span_checker(constraint_function, instant, nlp)
-        if (
-            constraint_function == Constraint.CONTACT_FORCE_INEQUALITY.value[0]
-            or constraint_function == Constraint.NON_SLIPPING.value[0]
-        ):
-            if instant == Instant.END or instant == nlp["ns"]:
+        if constraint_function in (Constraint.CONTACT_FORCE_INEQUALITY.value[0], Constraint.NON_SLIPPING.value[0]):
+            if instant in (Instant.END, nlp["ns"]):
                 raise RuntimeError("No control u at last node")
 
 
@@ -1,4 +1,4 @@
-from casadi import vertcat, MX
+from casadi import vertcat, horzcat, vertsplit, MX, Function
 import biorbd
 
 
@@ -13,19 +13,43 @@ class Dynamics:
         """
         q, qdot, tau = Dynamics.__dispatch_q_qdot_tau_data(states, controls, nlp)
 
+        qddot = biorbd.Model.ForwardDynamics(nlp["model"], q, qdot, tau).to_mx()
+
         qdot_reduced = nlp["q_mapping"].reduce.map(qdot)
-        if "external_forces" in nlp:
-            dxdt = MX(nlp["nx"], nlp["ns"])
-            for i, f_ext in enumerate(nlp["external_forces"]):
-                qddot = biorbd.Model.ForwardDynamics(nlp["model"], q, qdot, tau, f_ext).to_mx()
-                qddot_reduced = nlp["q_dot_mapping"].reduce.map(qddot)
-                dxdt[:, i] = vertcat(qdot_reduced, qddot_reduced)
-        else:
-            qddot = biorbd.Model.ForwardDynamics(nlp["model"], q, qdot, tau).to_mx()
-            qddot_reduced = nlp["q_dot_mapping"].reduce.map(qddot)
-            dxdt = vertcat(qdot_reduced, qddot_reduced)
+        qddot_reduced = nlp["q_dot_mapping"].reduce.map(qddot)
+        return vertcat(qdot_reduced, qddot_reduced)
+
+    @staticmethod
+    def forward_dynamics_torque_driven_with_external_forces(states, controls, nlp):
+        """
+        :param states: MX.sym from CasADi.
+        :param controls: MX.sym from CasADi.
+        :param nlp: An OptimalControlProgram class
+        :return: Derived states, one column per shooting node of the external forces.
+        """
+        return horzcat(
+            *[
+                Dynamics.forward_dynamics_torque_driven_with_node_external_forces(states, controls, nlp, f_ext)
+                for f_ext in nlp["external_forces"]
+            ]
+        )
+
+    @staticmethod
+    def forward_dynamics_torque_driven_with_node_external_forces(states, controls, nlp, f_ext):
+        """
+        :param states: MX.sym from CasADi.
+        :param controls: MX.sym from CasADi.
+        :param nlp: An OptimalControlProgram class
+        :param f_ext: External forces of one shooting node (6 x nb_external_forces)
+        :return: Vertcat of derived states at that shooting node.
+        """
+        q, qdot, tau = Dynamics.__dispatch_q_qdot_tau_data(states, controls, nlp)
+
+        qddot = Dynamics.__get_forward_dynamics_external_forces_func(nlp)(q, qdot, tau, f_ext)
 
-        return dxdt
+        qdot_reduced = nlp["q_mapping"].reduce.map(qdot)
+        qddot_reduced = nlp["q_dot_mapping"].reduce.map(qddot)
+        return vertcat(qdot_reduced, qddot_reduced)
 
     @staticmethod
     def forward_dynamics_torque_driven_with_contact(states, controls, nlp):
@@ -37,7 +61,7 @@ class Dynamics:
         """
         q, qdot, tau = Dynamics.__dispatch_q_qdot_tau_data(states, controls, nlp)
 
-        qddot = biorbd.Model.ForwardDynamicsConstraintsDirect(nlp["model"], q, qdot, tau).to_mx()
+        qddot, _ = Dynamics.__get_forward_dynamics_constraints_direct_func(nlp)(q, qdot, tau)
 
         qdot_reduced = nlp["q_mapping"].reduce.map(qdot)
         qddot_reduced = nlp["q_dot_mapping"].reduce.map(qddot)
@@ -47,16 +71,15 @@ class Dynamics:
     def forces_from_forward_dynamics_with_contact(states, controls, nlp):
         q, qdot, tau = Dynamics.__dispatch_q_qdot_tau_data(states, controls, nlp)
 
-        cs = nlp["model"].getConstraints()
-        biorbd.Model.ForwardDynamicsConstraintsDirect(nlp["model"], q, qdot, tau, cs)
-
-        return cs.getForce().to_mx()
+        _, contact_forces = Dynamics.__get_forward_dynamics_constraints_direct_func(nlp)(q, qdot, tau)
+        return contact_forces
 
     @staticmethod
     def forward_dynamics_torque_activations_driven(states, controls, nlp):
         q, qdot, torque_act = Dynamics.__dispatch_q_qdot_tau_data(states, controls, nlp)
 
-        tau = nlp["model"].torque(torque_act, q, qdot).to_mx()
+        # The generalized torque is given as is to the dynamics, without going through MX and back
+        tau = nlp["model"].torque(torque_act, q, qdot)
         qddot = nlp["model"].ForwardDynamics(q, qdot, tau).to_mx()
 
         qdot_reduced = nlp["q_mapping"].reduce.map(qdot)
@@ -68,7 +91,7 @@ class Dynamics:
         q, qdot, torque_act = Dynamics.__dispatch_q_qdot_tau_data(states, controls, nlp)
 
         tau = nlp["model"].torque(torque_act, q, qdot).to_mx()
-        qddot = nlp["model"].ForwardDynamicsConstraintsDirect(q, qdot, tau).to_mx()
+        qddot, _ = Dynamics.__get_forward_dynamics_constraints_direct_func(nlp)(q, qdot, tau)
 
         qdot_reduced = nlp["q_mapping"].reduce.map(qdot)
         qddot_reduced = nlp["q_dot_mapping"].reduce.map(qddot)
@@ -78,12 +101,8 @@ class Dynamics:
     def forward_dynamics_torque_muscle_driven(states, controls, nlp):
         q, qdot, residual_tau = Dynamics.__dispatch_q_qdot_tau_data(states, controls, nlp)
 
-        muscles_states = biorbd.VecBiorbdMuscleStateDynamics(nlp["nbMuscle"])
         muscles_activations = controls[nlp["nbTau"] :]
-
-        for k in range(nlp["nbMuscle"]):
-            muscles_states[k].setActivation(muscles_activations[k])
-        muscles_tau = nlp["model"].muscularJointTorque(muscles_states, q, qdot).to_mx()
+        muscles_tau = Dynamics.__get_muscular_joint_torque_func(nlp)(muscles_activations, q, qdot)
 
         tau = muscles_tau + residual_tau
 
@@ -97,16 +116,12 @@ class Dynamics:
     def forward_dynamics_muscle_activations_and_torque_driven_with_contact(states, controls, nlp):
         q, qdot, residual_tau = Dynamics.__dispatch_q_qdot_tau_data(states, controls, nlp)
 
-        muscles_states = biorbd.VecBiorbdMuscleStateDynamics(nlp["nbMuscle"])
         muscles_activations = controls[nlp["nbTau"] :]
-
-        for k in range(nlp["nbMuscle"]):
-            muscles_states[k].setActivation(muscles_activations[k])
-        muscles_tau = nlp["model"].muscularJointTorque(muscles_states, q, qdot).to_mx()
+        muscles_tau = Dynamics.__get_muscular_joint_torque_func(nlp)(muscles_activations, q, qdot)
 
         tau = muscles_tau + residual_tau
 
-        qddot = biorbd.Model.ForwardDynamicsConstraintsDirect(nlp["model"], q, qdot, tau).to_mx()
+        qddot, _ = Dynamics.__get_forward_dynamics_constraints_direct_func(nlp)(q, qdot, tau)
 
         qdot_reduced = nlp["q_mapping"].reduce.map(qdot)
         qddot_reduced = nlp["q_dot_mapping"].reduce.map(qddot)
@@ -116,19 +131,13 @@ class Dynamics:
     def forces_from_forward_dynamics_muscle_activations_and_torque_driven_with_contact(states, controls, nlp):
         q, qdot, residual_tau = Dynamics.__dispatch_q_qdot_tau_data(states, controls, nlp)
 
-        muscles_states = biorbd.VecBiorbdMuscleStateDynamics(nlp["nbMuscle"])
         muscles_activations = controls[nlp["nbTau"] :]
-
-        for k in range(nlp["nbMuscle"]):
-            muscles_states[k].setActivation(muscles_activations[k])
-        muscles_tau = nlp["model"].muscularJointTorque(muscles_states, q, qdot).to_mx()
+        muscles_tau = Dynamics.__get_muscular_joint_torque_func(nlp)(muscles_activations, q, qdot)
 
         tau = muscles_tau + residual_tau
 
-        cs = nlp["model"].getConstraints()
-        biorbd.Model.ForwardDynamicsConstraintsDirect(nlp["model"], q, qdot, tau, cs)
-
-        return cs.getForce().to_mx()
+        _, contact_forces = Dynamics.__get_forward_dynamics_constraints_direct_func(nlp)(q, qdot, tau)
+        return contact_forces
 
     @staticmethod
     def forward_dynamics_muscle_activations_driven(states, controls, nlp):
@@ -136,14 +145,10 @@ class Dynamics:
         q = nlp["q_mapping"].expand.map(states[:nq])
         qdot = nlp["q_dot_mapping"].expand.map(states[nq:])
 
-        muscles_states = biorbd.VecBiorbdMuscleStateDynamics(nlp["nbMuscle"])
         muscles_activations = controls
 
-        for k in range(nlp["nbMuscle"]):
-            muscles_states[k].setActivation(muscles_activations[k])
-
-        muscles_tau = nlp["model"].muscularJointTorque(muscles_states, q, qdot).to_mx()
-        qddot = biorbd.Model.ForwardDynamicsConstraintsDirect(nlp["model"], q, qdot, muscles_tau).to_mx()
+        muscles_tau = Dynamics.__get_muscular_joint_torque_func(nlp)(muscles_activations, q, qdot)
+        qddot, _ = Dynamics.__get_forward_dynamics_constraints_direct_func(nlp)(q, qdot, muscles_tau)
 
         qdot_reduced = nlp["q_mapping"].reduce.map(qdot)
         qddot_reduced = nlp["q_dot_mapping"].reduce.map(qddot)
@@ -155,17 +160,12 @@ class Dynamics:
         q = nlp["q_mapping"].expand.map(states[:nq])
         qdot = nlp["q_dot_mapping"].expand.map(states[nq:])
 
-        muscles_states = biorbd.VecBiorbdMuscleStateDynamics(nlp["nbMuscle"])
         muscles_excitation = controls
         muscles_activations = states[nlp["nbQ"] + nlp["nbQdot"] :]
+        muscles_activations_dot = Dynamics.__get_activation_dot_func(nlp)(muscles_excitation, muscles_activations)
 
-        for k in range(nlp["nbMuscle"]):
-            muscles_states[k].setExcitation(muscles_excitation[k])
-            muscles_states[k].setActivation(muscles_activations[k])
-        muscles_activations_dot = nlp["model"].activationDot(muscles_states).to_mx()
-
-        muscles_tau = nlp["model"].muscularJointTorque(muscles_states, q, qdot).to_mx()
-        qddot = biorbd.Model.ForwardDynamicsConstraintsDirect(nlp["model"], q, qdot, muscles_tau).to_mx()
+        muscles_tau = Dynamics.__get_muscular_joint_torque_func(nlp)(muscles_activations, q, qdot)
+        qddot, _ = Dynamics.__get_forward_dynamics_constraints_direct_func(nlp)(q, qdot, muscles_tau)
 
         qdot_reduced = nlp["q_mapping"].reduce.map(qdot)
         qddot_reduced = nlp["q_dot_mapping"].reduce.map(qddot)
@@ -175,18 +175,13 @@ class Dynamics:
     def forward_dynamics_muscle_excitations_and_torque_driven(states, controls, nlp):
         q, qdot, residual_tau = Dynamics.__dispatch_q_qdot_tau_data(states, controls, nlp)
 
-        muscles_states = biorbd.VecBiorbdMuscleStateDynamics(nlp["nbMuscle"])
         muscles_excitation = controls[nlp["nbTau"] :]
         muscles_activations = states[nlp["nbQ"] + nlp["nbQdot"] :]
+        muscles_activations_dot = Dynamics.__get_activation_dot_func(nlp)(muscles_excitation, muscles_activations)
 
-        for k in range(nlp["nbMuscle"]):
-            muscles_states[k].setExcitation(muscles_excitation[k])
-            muscles_states[k].setActivation(muscles_activations[k])
-        muscles_activations_dot = nlp["model"].activationDot(muscles_states).to_mx()
-
-        muscles_tau = nlp["model"].muscularJointTorque(muscles_states, q, qdot).to_mx()
+        muscles_tau = Dynamics.__get_muscular_joint_torque_func(nlp)(muscles_activations, q, qdot)
         tau = muscles_tau + residual_tau
-        qddot = biorbd.Model.ForwardDynamicsConstraintsDirect(nlp["model"], q, qdot, tau).to_mx()
+        qddot, _ = Dynamics.__get_forward_dynamics_constraints_direct_func(nlp)(q, qdot, tau)
 
         qdot_reduced = nlp["q_mapping"].reduce.map(qdot)
         qddot_reduced = nlp["q_dot_mapping"].reduce.map(qddot)
@@ -196,18 +191,13 @@ class Dynamics:
     def forward_dynamics_muscle_excitations_and_torque_driven_with_contact(states, controls, nlp):
         q, qdot, residual_tau = Dynamics.__dispatch_q_qdot_tau_data(states, controls, nlp)
 
-        muscles_states = biorbd.VecBiorbdMuscleStateDynamics(nlp["nbMuscle"])
         muscles_excitation = controls[nlp["nbTau"] :]
         muscles_activations = states[nlp["nbQ"] + nlp["nbQdot"] :]
+        muscles_activations_dot = Dynamics.__get_activation_dot_func(nlp)(muscles_excitation, muscles_activations)
 
-        for k in range(nlp["nbMuscle"]):
-            muscles_states[k].setExcitation(muscles_excitation[k])
-            muscles_states[k].setActivation(muscles_activations[k])
-        muscles_activations_dot = nlp["model"].activationDot(muscles_states).to_mx()
-
-        muscles_tau = nlp["model"].muscularJointTorque(muscles_states, q, qdot).to_mx()
+        muscles_tau = Dynamics.__get_muscular_joint_torque_func(nlp)(muscles_activations, q, qdot)
         tau = muscles_tau + residual_tau
-        qddot = biorbd.Model.ForwardDynamicsConstraintsDirect(nlp["model"], q, qdot, tau).to_mx()
+        qddot, _ = Dynamics.__get_forward_dynamics_constraints_direct_func(nlp)(q, qdot, tau)
 
         qdot_reduced = nlp["q_mapping"].reduce.map(qdot)
         qddot_reduced = nlp["q_dot_mapping"].reduce.map(qddot)
@@ -217,20 +207,97 @@ class Dynamics:
     def forces_from_forward_dynamics_muscle_excitations_and_torque_driven_with_contact(states, controls, nlp):
         q, qdot, residual_tau = Dynamics.__dispatch_q_qdot_tau_data(states, controls, nlp)
 
-        muscles_states = biorbd.VecBiorbdMuscleStateDynamics(nlp["nbMuscle"])
-        muscles_excitation = controls[nlp["nbTau"] :]
+        # The excitations only drive the activations dynamics, which the contact forces don't depend on
         muscles_activations = states[nlp["nbQ"] + nlp["nbQdot"] :]
+        muscles_tau = Dynamics.__get_muscular_joint_torque_func(nlp)(muscles_activations, q, qdot)
+        tau = muscles_tau + residual_tau
+        _, contact_forces = Dynamics.__get_forward_dynamics_constraints_direct_func(nlp)(q, qdot, tau)
+        return contact_forces
 
-        for k in range(nlp["nbMuscle"]):
-            muscles_states[k].setExcitation(muscles_excitation[k])
-            muscles_states[k].setActivation(muscles_activations[k])
-        muscles_activations_dot = nlp["model"].activationDot(muscles_states).to_mx()
+    @staticmethod
+    def __get_forward_dynamics_constraints_direct_func(nlp):
+        """
+        Returns the generalized accelerations and the contact forces of the forward dynamics with contacts.
+        Both are outputs of the same expanded function, built once per nlp and shared by the dynamics
+        and the contact forces so the constraint set is only computed once.
+        """
+        if "forward_dynamics_constraints_direct_func" not in nlp:
+            symbolic_q = MX.sym("q", nlp["model"].nbQ(), 1)
+            symbolic_qdot = MX.sym("qdot", nlp["model"].nbQdot(), 1)
+            symbolic_tau = MX.sym("tau", nlp["model"].nbGeneralizedTorque(), 1)
+
+            cs = nlp["model"].getConstraints()
+            qddot = biorbd.Model.ForwardDynamicsConstraintsDirect(
+                nlp["model"], symbolic_q, symbolic_qdot, symbolic_tau, cs
+            ).to_mx()
+
+            nlp["forward_dynamics_constraints_direct_func"] = Function(
+                "ForwardDynConstraintsDirect",
+                [symbolic_q, symbolic_qdot, symbolic_tau],
+                [qddot, cs.getForce().to_mx()],
+                ["q", "qdot", "tau"],
+                ["qddot", "contact_forces"],
+            ).expand()
+        return nlp["forward_dynamics_constraints_direct_func"]
 
-        muscles_tau = nlp["model"].muscularJointTorque(muscles_states, q, qdot).to_mx()
-        tau = muscles_tau + residual_tau
-        cs = nlp["model"].getConstraints()
-        biorbd.Model.ForwardDynamicsConstraintsDirect(nlp["model"], q, qdot, tau, cs)
-        return cs.getForce().to_mx()
+    @staticmethod
+    def __get_muscular_joint_torque_func(nlp):
+        """
+        Returns the joint torque generated by the muscles as a function of their activations. It is expanded and
+        built once per nlp, so the muscles states are not filled muscle by muscle each time the dynamics is built.
+        """
+        if "muscular_joint_torque_func" not in nlp:
+            symbolic_activations = MX.sym("activations", nlp["nbMuscle"], 1)
+            symbolic_q = MX.sym("q", nlp["model"].nbQ(), 1)
+            symbolic_qdot = MX.sym("qdot", nlp["model"].nbQdot(), 1)
+
+            muscles_states = Dynamics.__get_muscles_states(nlp, symbolic_activations)
+            muscles_tau = nlp["model"].muscularJointTorque(muscles_states, symbolic_q, symbolic_qdot).to_mx()
+
+            nlp["muscular_joint_torque_func"] = Function(
+                "MuscularJointTorque",
+                [symbolic_activations, symbolic_q, symbolic_qdot],
+                [muscles_tau],
+                ["activations", "q", "qdot"],
+                ["tau"],
+            ).expand()
+        return nlp["muscular_joint_torque_func"]
+
+    @staticmethod
+    def __get_activation_dot_func(nlp):
+        """
+        Returns the time derivative of the muscles activations as a function of their excitations and activations.
+        It is expanded and built once per nlp, so the muscles states are not filled each time the dynamics is built.
+        """
+        if "activation_dot_func" not in nlp:
+            symbolic_excitations = MX.sym("excitations", nlp["nbMuscle"], 1)
+            symbolic_activations = MX.sym("activations", nlp["nbMuscle"], 1)
+
+            muscles_states = Dynamics.__get_muscles_states(nlp, symbolic_activations, symbolic_excitations)
+            muscles_activations_dot = nlp["model"].activationDot(muscles_states).to_mx()
+
+            nlp["activation_dot_func"] = Function(
+                "ActivationDot",
+                [symbolic_excitations, symbolic_activations],
+                [muscles_activations_dot],
+                ["excitations", "activations"],
+                ["activations_dot"],
+            ).expand()
+        return nlp["activation_dot_func"]
+
+    @staticmethod
+    def __get_muscles_states(nlp, muscles_activations, muscles_excitations=None):
+        """
+        Returns the biorbd muscles states filled with the activations (and the excitations if any).
+        The vectors are split once instead of slicing an element at a time for each muscle.
+        """
+        muscles_states = biorbd.VecBiorbdMuscleStateDynamics(nlp["nbMuscle"])
+        for k, activation in enumerate(vertsplit(muscles_activations)):
+            muscles_states[k].setActivation(activation)
+        if muscles_excitations is not None:
+            for k, excitation in enumerate(vertsplit(muscles_excitations)):
+                muscles_states[k].setExcitation(excitation)
+        return muscles_states
 
     @staticmethod
     def __dispatch_q_qdot_tau_data(states, controls, nlp):
@@ -244,3 +311,34 @@ class Dynamics:
         tau = nlp["tau_mapping"].expand.map(controls[: nlp["nbTau"]])
 
         return q, qdot, tau
+
+    @staticmethod
+    def __get_forward_dynamics_external_forces_func(nlp):
+        """
+        Returns the forward dynamics with the external forces as a symbolic input, so the biorbd graph
+        is built once per nlp and only evaluated at each node instead of being rebuilt for each of them.
+        """
+        if "forward_dynamics_external_forces_func" not in nlp:
+            nb_q = nlp["model"].nbQ()
+            nb_qdot = nlp["model"].nbQdot()
+            nb_tau = nlp["model"].nbGeneralizedTorque()
+            nb_f_ext = nlp["external_forces"][0].shape[1]
+
+            symbolic_q = MX.sym("q", nb_q, 1)
+            symbolic_qdot = MX.sym("qdot", nb_qdot, 1)
+            symbolic_tau = MX.sym("tau", nb_tau, 1)
+            symbolic_f_ext = MX.sym("f_ext", 6, nb_f_ext)
+
+            sv = biorbd.VecBiorbdSpatialVector()
+            for idx in range(nb_f_ext):
+                sv.append(biorbd.SpatialVector(symbolic_f_ext[:, idx]))
+            qddot = biorbd.Model.ForwardDynamics(nlp["model"], symbolic_q, symbolic_qdot, symbolic_tau, sv).to_mx()
+
+            nlp["forward_dynamics_external_forces_func"] = Function(
+                "ForwardDynExternalForces",
+                [symbolic_q, symbolic_qdot, symbolic_tau, symbolic_f_ext],
+                [qddot],
+                ["q", "qdot", "tau", "f_ext"],
+                ["qddot"],
+            ).expand()
+        return nlp["forward_dynamics_external_forces_func"]
@@ -12,15 +12,21 @@ def RK4(ode, ode_opt):
 
     def dxdt(h, states, controls):
         u = controls
-        x = MX(states.shape[0], n_step + 1)
-        x[:, 0] = states
+        x = states
 
-        for i in range(1, n_step + 1):
-            k1 = fun(x[:, i - 1], u)[:, idx]
-            k2 = fun(x[:, i - 1] + h / 2 * k1, u)[:, idx]
-            k3 = fun(x[:, i - 1] + h / 2 * k2, u)[:, idx]
-            k4 = fun(x[:, i - 1] + h * k3, u)[:, idx]
-            x[:, i] = x[:, i - 1] + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
-        return x[:, -1]
+        for _ in range(n_step):
+            k1 = fun(x, u)[:, idx]
+            k2 = fun(x + h / 2 * k1, u)[:, idx]
+            k3 = fun(x + h / 2 * k2, u)[:, idx]
+            k4 = fun(x + h * k3, u)[:, idx]
+            x = x + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        return x
 
-    return Function("integrator", [x_sym, u_sym], [dxdt(h, x_sym, u_sym)], ["x0", "p"], ["xf"])
+    integrator = Function("integrator", [x_sym, u_sym], [dxdt(h, x_sym, u_sym)], ["x0", "p"], ["xf"])
+    if isinstance(h, MX):
+        # The time is optimized, so it is a free variable of the integrator, which prevents its expansion
+        return integrator
+    if not ode_opt["expand"]:
+        # Expanding would inline a just-in-time compiled dynamics back into the integrator
+        return integrator
+    return integrator.expand()
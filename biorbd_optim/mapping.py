@@ -18,6 +18,8 @@ class Mapping:
         self.map_idx = map_idx
         self.len = len(self.map_idx)
         self.sign_to_oppose = sign_to_oppose
+        self.zeroed_idx = [idx for idx, val in enumerate(self.map_idx) if val < 0]
+        self.is_identity = list(self.map_idx) == list(range(self.len)) and len(self.sign_to_oppose) == 0
 
     def map(self, obj):
         """
@@ -33,8 +35,13 @@ class Mapping:
         Expected result:
             - mapped_obj == np.array([0.1, 0.2, 0.2, -0.4, 0, 0.1])
         """
+        if self.is_identity and obj.shape[0] == self.len:
+            # Nothing to reorder, zero or oppose, so obj is returned as is
+            return obj
+
         mapped_obj = obj[self.map_idx, :]
-        mapped_obj[[idx for idx, val in enumerate(self.map_idx) if val < 0], :] = 0
+        if self.zeroed_idx:
+            mapped_obj[self.zeroed_idx, :] = 0
 
         if self.sign_to_oppose != ():
             mapped_obj[self.sign_to_oppose, :] *= -1
@@ -95,9 +95,7 @@ class ObjectiveFunction:
         if ocp.nlp[0]["nx"] != ocp.nlp[-1]["nx"]:
             raise RuntimeError("Cyclic constraint without same nx is not supported yet")
 
-        ocp.J += (
-            casadi.dot(ocp.nlp[-1]["X"][-1] - ocp.nlp[0]["X"][0], ocp.nlp[-1]["X"][-1] - ocp.nlp[0]["X"][0]) * weight
-        )
+        ocp.J += casadi.sumsqr(ocp.nlp[-1]["X"][-1] - ocp.nlp[0]["X"][0]) * weight
 
     @staticmethod
     def continuity(ocp):
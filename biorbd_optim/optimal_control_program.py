@@ -3,9 +3,10 @@ from copy import deepcopy
 import pickle
 import os
 
+import numpy as np
 import biorbd
 import casadi
-from casadi import MX, vertcat, sum1
+from casadi import MX, Function, vertcat, sum1
 
 from .enums import OdeSolver
 from .mapping import BidirectionalMapping
@@ -13,7 +14,9 @@ from .path_conditions import Bounds, InitialConditions, InterpolationType
 from .constraints import ConstraintFunction, Constraint
 from .objective_functions import Objective, ObjectiveFunction
 from .plot import OnlineCallback, CustomPlot
+from .dynamics import Dynamics
 from .integrator import RK4
+from .problem_type import JIT_OPTIONS
 from .biorbd_interface import BiorbdInterface
 from .variable_optimization import Data
 from .__version__ import __version__
@@ -48,6 +51,7 @@ class OptimalControlProgram:
         is_cyclic_objective=False,
         is_cyclic_constraint=False,
         nb_threads=1,
+        use_jit_dynamics=False,
     ):
         """
         Prepare CasADi to solve a problem, defines some parameters, dynamic problem and ode solver.
@@ -63,6 +67,7 @@ class OptimalControlProgram:
         :param X_bounds: Instance of the class Bounds.
         :param U_bounds: Instance of the class Bounds.
         :param constraints: Tuple of constraints, instant (which node(s)) and tuple of geometric structures used.
+        :param use_jit_dynamics: If the dynamics function should be compiled just-in-time (requires a C compiler).
         """
 
         if isinstance(biorbd_model, str):
@@ -98,6 +103,7 @@ class OptimalControlProgram:
             "is_cyclic_objective": is_cyclic_objective,
             "is_cyclic_constraint": is_cyclic_constraint,
             "nb_threads": nb_threads,
+            "use_jit_dynamics": use_jit_dynamics,
         }
 
         self.nlp = [{} for _ in range(self.nb_phases)]
@@ -118,7 +124,7 @@ class OptimalControlProgram:
             phase_time, objective_functions, constraints
         )
         self.__add_to_nlp("tf", phase_time, False)
-        self.__add_to_nlp("t0", [0] + [nlp["tf"] for i, nlp in enumerate(self.nlp) if i != len(self.nlp) - 1], False)
+        self.__add_to_nlp("t0", [0] + [nlp["tf"] for nlp in self.nlp[:-1]], False)
         self.__add_to_nlp(
             "dt", [self.nlp[i]["tf"] / max(self.nlp[i]["ns"], 1) for i in range(self.nb_phases)], False,
         )
@@ -147,6 +153,7 @@ class OptimalControlProgram:
                 reshaped_plot_mappings[i][key] = plot_mappings[key][i]
         self.__add_to_nlp("plot_mappings", reshaped_plot_mappings, False)
         self.__add_to_nlp("problem_type", problem_type, False)
+        self.__add_to_nlp("use_jit_dynamics", use_jit_dynamics, True)
         for i in range(self.nb_phases):
             self.__initialize_nlp(self.nlp[i])
             self.nlp[i]["problem_type"](self.nlp[i])
@@ -166,15 +173,21 @@ class OptimalControlProgram:
             self.nlp[i]["U_init"].check_and_adjust_dimensions(self.nlp[i]["nu"], self.nlp[i]["ns"] - 1)
 
         # Variables and constraint for the optimization program
+        # The bounds and initial guesses of every phase and parameter are written in place in preallocated vectors
+        nV = sum(nlp["nx"] * (nlp["ns"] + 1) + nlp["nu"] * nlp["ns"] for nlp in self.nlp) + len(initial_time_guess)
         self.V = []
-        self.V_bounds = Bounds(interpolation_type=InterpolationType.CONSTANT)
-        self.V_init = InitialConditions(interpolation_type=InterpolationType.CONSTANT)
+        self.V_bounds = Bounds(np.empty(nV), np.empty(nV), interpolation_type=InterpolationType.CONSTANT)
+        self.V_init = InitialConditions(np.empty(nV), interpolation_type=InterpolationType.CONSTANT)
+        offset = 0
         for i in range(self.nb_phases):
-            self.__define_multiple_shooting_nodes_per_phase(self.nlp[i], i)
+            offset = self.__define_multiple_shooting_nodes_per_phase(self.nlp[i], i, offset)
 
         # Declare the parameters to optimize
         self.param_to_optimize = {}
-        self.__define_variable_time(initial_time_guess, time_min, time_max)
+        self.__define_variable_time(initial_time_guess, time_min, time_max, offset)
+
+        # The variables of every phase and parameter are concatenated only once
+        self.V = vertcat(*self.V)
 
         # Define dynamic problem
         self.__add_to_nlp("ode_solver", ode_solver, True)
@@ -245,19 +258,35 @@ class OptimalControlProgram:
         """
 
         dynamics = nlp["dynamics_func"]
-        ode_opt = {"t0": 0, "tf": nlp["dt"]}
+        # A just-in-time compiled dynamics must be called as is, so the integrators are not expanded
+        ode_opt = {"t0": 0, "tf": nlp["dt"], "expand": not nlp.get("use_jit_dynamics", False)}
         if nlp["ode_solver"] == OdeSolver.RK or nlp["ode_solver"] == OdeSolver.COLLOCATION:
             ode_opt["number_of_finite_elements"] = 5
 
         ode = {"x": nlp["x"], "p": nlp["u"], "ode": dynamics(nlp["x"], nlp["u"])}
         nlp["dynamics"] = []
-        nlp["par_dynamics"] = {}
+        nlp["par_dynamics"] = None
         if nlp["ode_solver"] == OdeSolver.RK:
             ode_opt["idx"] = 0
             ode["ode"] = dynamics
             if "external_forces" in nlp:
-                for idx in range(len(nlp["external_forces"])):
-                    ode_opt["idx"] = idx
+                # Each node gets its own dynamics, built with its external forces only, instead of evaluating
+                # the dynamics of every node at each step of RK4
+                symbolic_states = MX.sym("x", nlp["nx"], 1)
+                symbolic_controls = MX.sym("u", nlp["nu"], 1)
+                expand_options = JIT_OPTIONS if nlp.get("use_jit_dynamics", False) else {}
+                for idx, f_ext in enumerate(nlp["external_forces"]):
+                    ode["ode"] = Function(
+                        f"ForwardDyn_{idx}",
+                        [symbolic_states, symbolic_controls],
+                        [
+                            Dynamics.forward_dynamics_torque_driven_with_node_external_forces(
+                                symbolic_states, symbolic_controls, nlp, f_ext
+                            )
+                        ],
+                        ["x", "u"],
+                        ["xdot"],
+                    ).expand(f"ForwardDyn_{idx}", expand_options)
                     nlp["dynamics"].append(RK4(ode, ode_opt))
             else:
                 nlp["dynamics"].append(RK4(ode, ode_opt))
@@ -277,46 +306,55 @@ class OptimalControlProgram:
         if len(nlp["dynamics"]) == 1:
             if self.nb_threads > 1:
                 nlp["par_dynamics"] = nlp["dynamics"][0].map(nlp["ns"], "thread", self.nb_threads)
+            elif not isinstance(nlp["tf"], MX):
+                # An optimized time is a free variable of the integrator, which a map cannot evaluate,
+                # so the continuity keeps calling the integrator node by node
+                nlp["par_dynamics"] = nlp["dynamics"][0].map(nlp["ns"])
             nlp["dynamics"] = nlp["dynamics"] * nlp["ns"]
 
-    def __define_multiple_shooting_nodes_per_phase(self, nlp, idx_phase):
+    def __define_multiple_shooting_nodes_per_phase(self, nlp, idx_phase, offset):
         """
-        For each node, puts X_bounds and U_bounds in V_bounds.
+        For each node, puts X_bounds, U_bounds, X_init and U_init in V_bounds and V_init.
         Links X and U with V.
         :param nlp: The nlp problem
+        :param offset: Index of the first variable of the phase in V
+        :return: Index of the first variable after the phase in V
         """
-        X = []
-        U = []
+        nx, nu, ns = nlp["nx"], nlp["nu"], nlp["ns"]
 
-        nV = nlp["nx"] * (nlp["ns"] + 1) + nlp["nu"] * nlp["ns"]
+        nV = nx * (ns + 1) + nu * ns
         V = MX.sym("V_" + str(idx_phase), nV)
-        V_bounds = Bounds([0] * nV, [0] * nV, interpolation_type=InterpolationType.CONSTANT)
-        V_init = InitialConditions([0] * nV, interpolation_type=InterpolationType.CONSTANT)
+        phase = slice(offset, offset + nV)
+        self.V_bounds.min[phase, 0] = self.__nodes_to_vector(nlp["X_bounds"].min, nlp["U_bounds"].min, ns)
+        self.V_bounds.max[phase, 0] = self.__nodes_to_vector(nlp["X_bounds"].max, nlp["U_bounds"].max, ns)
+        self.V_init.init[phase, 0] = self.__nodes_to_vector(nlp["X_init"].init, nlp["U_init"].init, ns)
 
-        offset = 0
-        for k in range(nlp["ns"] + 1):
-            X.append(V.nz[offset : offset + nlp["nx"]])
-            V_bounds.min[offset : offset + nlp["nx"], 0] = nlp["X_bounds"].min.evaluate_at(shooting_point=k)
-            V_bounds.max[offset : offset + nlp["nx"], 0] = nlp["X_bounds"].max.evaluate_at(shooting_point=k)
-            V_init.init[offset : offset + nlp["nx"], 0] = nlp["X_init"].init.evaluate_at(shooting_point=k)
-            offset += nlp["nx"]
-
-            if k != nlp["ns"]:
-                U.append(V.nz[offset : offset + nlp["nu"]])
-                V_bounds.min[offset : offset + nlp["nu"], 0] = nlp["U_bounds"].min.evaluate_at(shooting_point=k)
-                V_bounds.max[offset : offset + nlp["nu"], 0] = nlp["U_bounds"].max.evaluate_at(shooting_point=k)
-                V_init.init[offset : offset + nlp["nu"], 0] = nlp["U_init"].init.evaluate_at(shooting_point=k)
-                offset += nlp["nu"]
-
-        V_bounds.check_and_adjust_dimensions(nV, 1)
-        V_init.check_and_adjust_dimensions(nV, 1)
+        # Each node starts with its states, followed by its controls (except for the last node)
+        node_starts = range(0, nV, nx + nu)
+        X = [V.nz[start : start + nx] for start in node_starts]
+        U = [V.nz[start + nx : start + nx + nu] for start in node_starts[:-1]]
 
         nlp["X"] = X
         nlp["U"] = U
-        self.V = vertcat(self.V, V)
+        self.V.append(V)
+        return offset + nV
 
-        self.V_bounds.concatenate(V_bounds)
-        self.V_init.concatenate(V_init)
+    @staticmethod
+    def __nodes_to_vector(x_condition, u_condition, ns):
+        """
+        Evaluates the states and the controls conditions at each node and orders them as in V (x_0, u_0, ..., x_ns).
+        :param x_condition: PathCondition of the states
+        :param u_condition: PathCondition of the controls
+        :param ns: Number of shooting points
+        :return: The values of the phase, as a vector
+        """
+        nx = x_condition.shape[0]
+        nu = u_condition.shape[0]
+        nodes = np.empty((ns + 1, nx + nu))
+        nodes[:, :nx] = x_condition.evaluate_at_all(ns + 1).T
+        nodes[:-1, nx:] = u_condition.evaluate_at_all(ns).T
+        # There is no control at the last node
+        return nodes.ravel()[: nodes.size - nu]
 
     def __init_phase_time(self, phase_time, objective_functions, constraints):
         if isinstance(phase_time, (int, float)):
@@ -351,7 +389,7 @@ class OptimalControlProgram:
                     time_max.append(pen_fun["maximum"] if "maximum" in pen_fun else inf)
         return has_penalty
 
-    def __define_variable_time(self, initial_guess, minimum, maximum):
+    def __define_variable_time(self, initial_guess, minimum, maximum, offset):
         """
         For each variable time, puts X_bounds and U_bounds in V_bounds.
         Links X and U with V.
@@ -359,22 +397,22 @@ class OptimalControlProgram:
         :param initial_guess: The initial values taken from the phase_time vector
         :param minimum: variable time minimums as set by user (default: 0)
         :param maximum: variable time maximums as set by user (default: inf)
+        :param offset: Index of the first variable time in V
         """
-        P = []
-        for nlp in self.nlp:
-            if isinstance(nlp["tf"], MX):
-                self.V = vertcat(self.V, nlp["tf"])
-                P.append(self.V[-1])
+        P = [nlp["tf"] for nlp in self.nlp if isinstance(nlp["tf"], MX)]
+        self.V.extend(P)
         self.param_to_optimize["time"] = P
 
         nV = len(initial_guess)
         V_bounds = Bounds(minimum, maximum, interpolation_type=InterpolationType.CONSTANT)
         V_bounds.check_and_adjust_dimensions(nV, 1)
-        self.V_bounds.concatenate(V_bounds)
 
         V_init = InitialConditions(initial_guess, interpolation_type=InterpolationType.CONSTANT)
         V_init.check_and_adjust_dimensions(nV, 1)
-        self.V_init.concatenate(V_init)
+
+        self.V_bounds.min[offset : offset + nV, 0] = V_bounds.min[:, 0]
+        self.V_bounds.max[offset : offset + nV, 0] = V_bounds.max[:, 0]
+        self.V_init.init[offset : offset + nV, 0] = V_init.init[:, 0]
 
     def __init_penalty(self, penalties, penalty_type):
         if len(penalties) > 0:
@@ -456,34 +494,39 @@ class OptimalControlProgram:
 
         nlp["plot"][plot_name] = custom_plot
 
-    def solve(self, solver="ipopt", show_online_optim=False, options_ipopt={}):
+    def solve(self, solver="ipopt", show_online_optim=False, options_ipopt={}, use_jit=False, warm_start=None):
         """
         Gives to CasADi states, controls, constraints, sum of all objective functions and theirs bounds.
         Gives others parameters to control how solver works.
+        If use_jit is True, the NLP functions are compiled just-in-time (requires a C compiler).
+        warm_start is the solution of a previous solve of a problem of the same size. Its variables and
+        multipliers are used as starting point instead of the initial guess.
         """
-        all_J = MX()
-        for j_nodes in self.J:
-            for j in j_nodes:
-                all_J = vertcat(all_J, j)
+        all_J = [j for j_nodes in self.J for j in j_nodes]
         for nlp in self.nlp:
-            for obj_nodes in nlp["J"]:
-                for obj in obj_nodes:
-                    all_J = vertcat(all_J, obj)
-
-        all_g = MX()
-        all_g_bounds = Bounds(interpolation_type=InterpolationType.CONSTANT)
-        for i in range(len(self.g)):
-            for j in range(len(self.g[i])):
-                all_g = vertcat(all_g, self.g[i][j])
-                all_g_bounds.concatenate(self.g_bounds[i][j])
+            all_J.extend(obj for obj_nodes in nlp["J"] for obj in obj_nodes)
+        all_J = vertcat(*all_J) if all_J else MX()
+
+        all_g = [g for g_nodes in self.g for g in g_nodes]
+        all_g_bounds = [g_bounds for g_bounds_nodes in self.g_bounds for g_bounds in g_bounds_nodes]
         for nlp in self.nlp:
-            for i in range(len(nlp["g"])):
-                for j in range(len(nlp["g"][i])):
-                    all_g = vertcat(all_g, nlp["g"][i][j])
-                    all_g_bounds.concatenate(nlp["g_bounds"][i][j])
+            all_g.extend(g for g_nodes in nlp["g"] for g in g_nodes)
+            all_g_bounds.extend(g_bounds for g_bounds_nodes in nlp["g_bounds"] for g_bounds in g_bounds_nodes)
+        if all_g:
+            all_g = vertcat(*all_g)
+            all_g_bounds = Bounds(
+                np.concatenate([np.asarray(g_bounds.min) for g_bounds in all_g_bounds]),
+                np.concatenate([np.asarray(g_bounds.max) for g_bounds in all_g_bounds]),
+                interpolation_type=InterpolationType.CONSTANT,
+            )
+        else:
+            all_g = MX()
+            all_g_bounds = Bounds(interpolation_type=InterpolationType.CONSTANT)
         nlp = {"x": self.V, "f": sum1(all_J), "g": all_g}
 
         options_common = {}
+        if use_jit:
+            options_common.update(JIT_OPTIONS)
         if show_online_optim:
             options_common["iteration_callback"] = OnlineCallback(self)
 
@@ -493,8 +536,12 @@ class OptimalControlProgram:
                 "ipopt.max_iter": 1000,
                 "ipopt.hessian_approximation": "exact",  # "exact", "limited-memory"
                 "ipopt.limited_memory_max_history": 50,
-                "ipopt.linear_solver": "mumps",  # "ma57", "ma86", "mumps"
+                "ipopt.linear_solver": "mumps",  # "ma57", "ma86", "ma97", "mumps"
             }
+            if warm_start is not None:
+                options["ipopt.warm_start_init_point"] = "yes"
+                options["ipopt.warm_start_bound_push"] = 1e-9
+                options["ipopt.warm_start_mult_bound_push"] = 1e-9
             for key in options_ipopt:
                 ipopt_key = key
                 if key[:6] != "ipopt.":
@@ -513,6 +560,10 @@ class OptimalControlProgram:
             "ubg": all_g_bounds.max,
             "x0": self.V_init.init,
         }
+        if warm_start is not None:
+            arg["x0"] = warm_start["x"]
+            arg["lam_x0"] = warm_start["lam_x"]
+            arg["lam_g0"] = warm_start["lam_g"]
 
         # Solve the problem
         return solver.call(arg)
@@ -544,7 +595,7 @@ class OptimalControlProgram:
             os.makedirs(dir)
 
         with open(file_path, "wb") as file:
-            pickle.dump(dict, file)
+            pickle.dump(dict, file, protocol=pickle.HIGHEST_PROTOCOL)
 
     @staticmethod
     def load(file_path):
@@ -58,19 +58,10 @@ class PathCondition(np.ndarray):
         super(PathCondition, self).__setstate__(state[0:-2])
 
     def check_and_adjust_dimensions(self, nb_elements, nb_shooting, condition_type):
-        if (
-            self.type == InterpolationType.CONSTANT
-            or self.type == InterpolationType.CONSTANT_WITH_FIRST_AND_LAST_DIFFERENT
-            or self.type == InterpolationType.LINEAR
-        ):
-            self.nb_shooting = nb_shooting
-        elif self.type == InterpolationType.EACH_FRAME:
+        if self.type == InterpolationType.EACH_FRAME:
             self.nb_shooting = nb_shooting + 1
         else:
-            if self.nb_shooting != nb_shooting:
-                raise RuntimeError(
-                    f"Invalid number of shooting ({self.nb_shooting}), the expected number is {nb_shooting}"
-                )
+            self.nb_shooting = nb_shooting
 
         if self.shape[0] != nb_elements:
             raise RuntimeError(
@@ -106,7 +97,7 @@ class PathCondition(np.ndarray):
 
     def evaluate_at(self, shooting_point):
         if self.nb_shooting is None:
-            raise RuntimeError(f"check_and_adjust_dimensions must be called at least once before evaluating at")
+            raise RuntimeError("check_and_adjust_dimensions must be called at least once before evaluating at")
 
         if self.type == InterpolationType.CONSTANT:
             return self[:, 0]
@@ -122,7 +113,31 @@ class PathCondition(np.ndarray):
         elif self.type == InterpolationType.EACH_FRAME:
             return self[:, shooting_point]
         else:
-            raise RuntimeError(f"InterpolationType is not implemented yet")
+            raise RuntimeError("InterpolationType is not implemented yet")
+
+    def evaluate_at_all(self, nb_points):
+        """
+        Evaluates the condition at every shooting point at once.
+        :param nb_points: Number of shooting points to evaluate, starting from 0
+        :return: The values, one shooting point per column
+        """
+        if self.nb_shooting is None:
+            raise RuntimeError("check_and_adjust_dimensions must be called at least once before evaluating at")
+
+        if self.type == InterpolationType.CONSTANT:
+            return np.repeat(np.asarray(self[:, 0:1]), nb_points, axis=1)
+        elif self.type == InterpolationType.CONSTANT_WITH_FIRST_AND_LAST_DIFFERENT:
+            values = np.repeat(np.asarray(self[:, 1:2]), nb_points, axis=1)
+            if self.nb_shooting < nb_points:
+                values[:, self.nb_shooting] = self[:, 2]
+            values[:, 0] = self[:, 0]
+            return values
+        elif self.type == InterpolationType.LINEAR:
+            return np.asarray(self[:, 0:1] + (self[:, 1:2] - self[:, 0:1]) * np.arange(nb_points) / self.nb_shooting)
+        elif self.type == InterpolationType.EACH_FRAME:
+            return np.asarray(self[:, :nb_points])
+        else:
+            raise RuntimeError("InterpolationType is not implemented yet")
 
 
 class Bounds:
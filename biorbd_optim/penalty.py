@@ -18,8 +18,9 @@ class PenaltyFunctionAbstract:
                 data_to_track, [nlp["ns"] + 1, max(states_idx) + 1]
             )
 
+            is_tracking = data_to_track.any()
             for i, v in enumerate(x):
-                val = v[states_idx] - data_to_track[t[i], states_idx]
+                val = v[states_idx] - data_to_track[t[i], states_idx] if is_tracking else v[states_idx]
                 penalty_type._add_to_penalty(ocp, nlp, val, **extra_param)
 
             PenaltyFunctionAbstract._add_track_data_to_plot(
@@ -36,9 +37,19 @@ class PenaltyFunctionAbstract:
             )
 
             nq = nlp["q_mapping"].reduce.len
+            q_expand = nlp["q_mapping"].expand
+            model = nlp["model"]
+
+            # The markers only depend on q, so the function is built once on q alone
+            symbolic_q = casadi.MX.sym("q", nq, 1)
+            markers = model.markers(q_expand.map(symbolic_q))[:, markers_idx]
+            markers_func = casadi.Function("MinimizeMarkers", [symbolic_q], [markers]).expand()
+
+            is_tracking = data_to_track.any()
             for i, v in enumerate(x):
-                q = nlp["q_mapping"].expand.map(v[:nq])
-                val = nlp["model"].markers(q)[:, markers_idx] - data_to_track[:, markers_idx, t[i]]
+                val = markers_func(v[:nq])
+                if is_tracking:
+                    val = val - data_to_track[:, markers_idx, t[i]]
                 penalty_type._add_to_penalty(ocp, nlp, val, **extra_param)
 
         @staticmethod
@@ -51,27 +62,27 @@ class PenaltyFunctionAbstract:
                 markers_idx, nlp["model"].nbMarkers(), "markers_idx"
             )
 
-            for i in range(len(x) - 1):
+            if coordinates_system_idx >= nb_rts:
+                raise RuntimeError(
+                    f"Wrong choice of coordinates_system_idx. (Negative values refer to global coordinates system, "
+                    f"positive values must be between 0 and {nb_rts})"
+                )
+
+            # Each node is the end of an interval and the start of the next one, so it is computed only once
+            model = nlp["model"]
+            markers_in_jcs = []
+            for v in x:
                 if coordinates_system_idx < 0:
-                    inv_jcs_1 = casadi.MX.eye(4)
-                    inv_jcs_0 = casadi.MX.eye(4)
-                elif coordinates_system_idx < nb_rts:
-                    jcs_1 = nlp["model"].globalJCS(x[i + 1][:n_q], coordinates_system_idx).to_mx()
-                    inv_jcs_1 = casadi.vertcat(
-                        casadi.horzcat(jcs_1[:3, :3], -jcs_1[:3, :3] @ jcs_1[:3, 3]), casadi.horzcat(0, 0, 0, 1)
-                    )
-                    jcs_0 = nlp["model"].globalJCS(x[i][:n_q], coordinates_system_idx).to_mx()
-                    inv_jcs_0 = casadi.vertcat(
-                        casadi.horzcat(jcs_0[:3, :3], -jcs_0[:3, :3] @ jcs_0[:3, 3]), casadi.horzcat(0, 0, 0, 1)
-                    )
+                    inv_jcs = casadi.MX.eye(4)
                 else:
-                    raise RuntimeError(
-                        f"Wrong choice of coordinates_system_idx. (Negative values refer to global coordinates system, "
-                        f"positive values must be between 0 and {nb_rts})"
+                    jcs = model.globalJCS(v[:n_q], coordinates_system_idx).to_mx()
+                    inv_jcs = casadi.vertcat(
+                        casadi.horzcat(jcs[:3, :3], -jcs[:3, :3] @ jcs[:3, 3]), casadi.horzcat(0, 0, 0, 1)
                     )
-                val = inv_jcs_1 @ casadi.vertcat(
-                    nlp["model"].markers(x[i + 1][:n_q])[:, markers_idx], 1
-                ) - inv_jcs_0 @ casadi.vertcat(nlp["model"].markers(x[i][:n_q])[:, markers_idx], 1)
+                markers_in_jcs.append(inv_jcs @ casadi.vertcat(model.markers(v[:n_q])[:, markers_idx], 1))
+
+            for i in range(len(x) - 1):
+                val = markers_in_jcs[i + 1] - markers_in_jcs[i]
                 penalty_type._add_to_penalty(ocp, nlp, val[:3], **extra_param)
 
         @staticmethod
@@ -85,12 +96,13 @@ class PenaltyFunctionAbstract:
                 data_to_track, [3, max(markers_idx) + 1, nlp["ns"] + 1]
             )
 
+            model = nlp["model"]
+            is_tracking = data_to_track.any()
             for m in markers_idx:
                 for i, v in enumerate(x):
-                    val = (
-                        nlp["model"].markerVelocity(v[:n_q], v[n_q : n_q + n_qdot], m).to_mx()
-                        - data_to_track[:, markers_idx, t[i]]
-                    )
+                    val = model.markerVelocity(v[:n_q], v[n_q : n_q + n_qdot], m).to_mx()
+                    if is_tracking:
+                        val = val - data_to_track[:, markers_idx, t[i]]
                     penalty_type._add_to_penalty(ocp, nlp, val, **extra_param)
 
         @staticmethod
@@ -106,12 +118,18 @@ class PenaltyFunctionAbstract:
             )
 
             nq = nlp["q_mapping"].reduce.len
-            for v in x:
-                q = nlp["q_mapping"].expand.map(v[:nq])
-                first_marker = nlp["model"].marker(q, first_marker_idx).to_mx()
-                second_marker = nlp["model"].marker(q, second_marker_idx).to_mx()
+            q_expand = nlp["q_mapping"].expand
+            model = nlp["model"]
 
-                val = first_marker - second_marker
+            # The expression is the same at every node, so it is built only once
+            symbolic_q = casadi.MX.sym("q", nq, 1)
+            q = q_expand.map(symbolic_q)
+            first_marker = model.marker(q, first_marker_idx).to_mx()
+            second_marker = model.marker(q, second_marker_idx).to_mx()
+            align_func = casadi.Function("AlignMarkers", [symbolic_q], [first_marker - second_marker]).expand()
+
+            for v in x:
+                val = align_func(v[:nq])
                 penalty_type._add_to_penalty(ocp, nlp, val, **extra_param)
 
         @staticmethod
@@ -152,8 +170,9 @@ class PenaltyFunctionAbstract:
                 data_to_track, [nlp["ns"], max(controls_idx) + 1]
             )
 
+            is_tracking = data_to_track.any()
             for i, v in enumerate(u):
-                val = v[controls_idx] - data_to_track[t[i], controls_idx]
+                val = v[controls_idx] - data_to_track[t[i], controls_idx] if is_tracking else v[controls_idx]
                 penalty_type._add_to_penalty(ocp, nlp, val, **extra_param)
 
             PenaltyFunctionAbstract._add_track_data_to_plot(
@@ -169,8 +188,11 @@ class PenaltyFunctionAbstract:
 
             # Add the nbTau offset to the muscle index
             muscles_idx_plus_tau = [idx + nlp["nbTau"] for idx in muscles_idx]
+            is_tracking = data_to_track.any()
             for i, v in enumerate(u):
-                val = v[muscles_idx_plus_tau] - data_to_track[t[i], muscles_idx]
+                val = v[muscles_idx_plus_tau]
+                if is_tracking:
+                    val = val - data_to_track[t[i], muscles_idx]
                 penalty_type._add_to_penalty(ocp, nlp, val, **extra_param)
 
             PenaltyFunctionAbstract._add_track_data_to_plot(
@@ -185,19 +207,24 @@ class PenaltyFunctionAbstract:
                 data_to_track, [nlp["ns"], max(controls_idx) + 1]
             )
 
+            is_tracking = data_to_track.any()
             for i, v in enumerate(u):
-                val = v[controls_idx] - data_to_track[t[i], controls_idx]
+                val = v[controls_idx] - data_to_track[t[i], controls_idx] if is_tracking else v[controls_idx]
                 penalty_type._add_to_penalty(ocp, nlp, val, **extra_param)
 
         @staticmethod
         def minimize_predicted_com_height(penalty_type, ocp, nlp, t, x, u, **extra_param):
             g = -9.81  # get gravity from biorbd
 
+            n_q = nlp["nbQ"]
+            q_expand = nlp["q_mapping"].expand
+            q_dot_expand = nlp["q_dot_mapping"].expand
+            model = nlp["model"]
             for i, v in enumerate(x):
-                q = nlp["q_mapping"].expand.map(v[: nlp["nbQ"]])
-                q_dot = nlp["q_dot_mapping"].expand.map(v[nlp["nbQ"] :])
-                CoM = nlp["model"].CoM(q).to_mx()
-                CoM_dot = nlp["model"].CoMdot(q, q_dot).to_mx()
+                q = q_expand.map(v[:n_q])
+                q_dot = q_dot_expand.map(v[n_q:])
+                CoM = model.CoM(q).to_mx()
+                CoM_dot = model.CoMdot(q, q_dot).to_mx()
                 CoM_height = (CoM_dot[2] * CoM_dot[2]) / (2 * -g) + CoM[2]
                 penalty_type._add_to_penalty(ocp, nlp, CoM_height, **extra_param)
 
@@ -209,9 +236,10 @@ class PenaltyFunctionAbstract:
                 data_to_track, [nlp["ns"], max(contacts_idx) + 1]
             )
 
+            is_tracking = data_to_track.any()
             for i, v in enumerate(u):
                 force = nlp["contact_forces_func"](x[i], u[i])
-                val = force[contacts_idx] - data_to_track[t[i], contacts_idx]
+                val = force[contacts_idx] - data_to_track[t[i], contacts_idx] if is_tracking else force[contacts_idx]
                 penalty_type._add_to_penalty(ocp, nlp, val, **extra_param)
 
             PenaltyFunctionAbstract._add_track_data_to_plot(
@@ -230,10 +258,12 @@ class PenaltyFunctionAbstract:
             PenaltyFunctionAbstract._check_idx("rt", rt_idx, nlp["model"].nbRTs())
 
             nq = nlp["q_mapping"].reduce.len
+            q_expand = nlp["q_mapping"].expand
+            model = nlp["model"]
             for v in x:
-                q = nlp["q_mapping"].expand.map(v[:nq])
-                r_seg = nlp["model"].globalJCS(q, segment_idx).rot()
-                r_rt = nlp["model"].RT(q, rt_idx).rot()
+                q = q_expand.map(v[:nq])
+                r_seg = model.globalJCS(q, segment_idx).rot()
+                r_rt = model.RT(q, rt_idx).rot()
                 val = biorbd.Rotation_toEulerAngles(r_seg.transpose() * r_rt, "zyx").to_mx()
                 penalty_type._add_to_penalty(ocp, nlp, val, **extra_param)
 
@@ -245,11 +275,13 @@ class PenaltyFunctionAbstract:
                 raise RuntimeError("axis must be a biorbd_optim.Axe")
 
             nq = nlp["q_mapping"].reduce.len
+            q_expand = nlp["q_mapping"].expand
+            model = nlp["model"]
             for v in x:
-                q = nlp["q_mapping"].expand.map(v[:nq])
+                q = q_expand.map(v[:nq])
 
-                r_rt = nlp["model"].globalJCS(q, segment_idx)
-                marker = nlp["model"].marker(q, marker_idx)
+                r_rt = model.globalJCS(q, segment_idx)
+                marker = model.marker(q, marker_idx)
                 marker.applyRT(r_rt.transpose())
                 marker = marker.to_mx()
 
@@ -296,20 +328,20 @@ class PenaltyFunctionAbstract:
     @staticmethod
     def _parameter_modifier(penalty_function, parameters):
         # Everything that should change the entry parameters depending on the penalty can be added here
-        if (
-            penalty_function == PenaltyType.MINIMIZE_STATE
-            or penalty_function == PenaltyType.MINIMIZE_MARKERS
-            or penalty_function == PenaltyType.MINIMIZE_MARKERS_DISPLACEMENT
-            or penalty_function == PenaltyType.MINIMIZE_MARKERS_VELOCITY
-            or penalty_function == PenaltyType.ALIGN_MARKERS
-            or penalty_function == PenaltyType.PROPORTIONAL_STATE
-            or penalty_function == PenaltyType.PROPORTIONAL_CONTROL
-            or penalty_function == PenaltyType.MINIMIZE_TORQUE
-            or penalty_function == PenaltyType.MINIMIZE_MUSCLES_CONTROL
-            or penalty_function == PenaltyType.MINIMIZE_ALL_CONTROLS
-            or penalty_function == PenaltyType.MINIMIZE_CONTACT_FORCES
-            or penalty_function == PenaltyType.ALIGN_SEGMENT_WITH_CUSTOM_RT
-            or penalty_function == PenaltyType.ALIGN_MARKER_WITH_SEGMENT_AXIS
+        if penalty_function in (
+            PenaltyType.MINIMIZE_STATE,
+            PenaltyType.MINIMIZE_MARKERS,
+            PenaltyType.MINIMIZE_MARKERS_DISPLACEMENT,
+            PenaltyType.MINIMIZE_MARKERS_VELOCITY,
+            PenaltyType.ALIGN_MARKERS,
+            PenaltyType.PROPORTIONAL_STATE,
+            PenaltyType.PROPORTIONAL_CONTROL,
+            PenaltyType.MINIMIZE_TORQUE,
+            PenaltyType.MINIMIZE_MUSCLES_CONTROL,
+            PenaltyType.MINIMIZE_ALL_CONTROLS,
+            PenaltyType.MINIMIZE_CONTACT_FORCES,
+            PenaltyType.ALIGN_SEGMENT_WITH_CUSTOM_RT,
+            PenaltyType.ALIGN_MARKER_WITH_SEGMENT_AXIS,
         ):
             if "quadratic" not in parameters.keys():
                 parameters["quadratic"] = True
@@ -322,13 +354,13 @@ class PenaltyFunctionAbstract:
     @staticmethod
     def _span_checker(penalty_function, instant, nlp):
         # Everything that is suspicious in terms of the span of the penalty function ca be checked here
-        if (
-            penalty_function == PenaltyType.PROPORTIONAL_CONTROL
-            or penalty_function == PenaltyType.MINIMIZE_TORQUE
-            or penalty_function == PenaltyType.MINIMIZE_MUSCLES_CONTROL
-            or penalty_function == PenaltyType.MINIMIZE_ALL_CONTROLS
+        if penalty_function in (
+            PenaltyType.PROPORTIONAL_CONTROL,
+            PenaltyType.MINIMIZE_TORQUE,
+            PenaltyType.MINIMIZE_MUSCLES_CONTROL,
+            PenaltyType.MINIMIZE_ALL_CONTROLS,
         ):
-            if instant == Instant.END or instant == nlp["ns"]:
+            if instant in (Instant.END, nlp["ns"]):
                 raise RuntimeError("No control u at last node")
 
     @staticmethod
@@ -353,11 +385,10 @@ class PenaltyFunctionAbstract:
                     raise RuntimeError(
                         f"data_to_track {data_to_track.shape}don't correspond to expected minimum size {target_size}"
                     )
-            for i in range(len(target_size)):
-                if data_to_track.shape[i] < target_size[i]:
-                    raise RuntimeError(
-                        f"data_to_track {data_to_track.shape} don't correspond to expected minimum size {target_size}"
-                    )
+            if (np.array(data_to_track.shape) < np.array(target_size)).any():
+                raise RuntimeError(
+                    f"data_to_track {data_to_track.shape} don't correspond to expected minimum size {target_size}"
+                )
         else:
             data_to_track = np.zeros(target_size)
         return data_to_track
@@ -111,6 +111,7 @@ class PlotOcp:
             return
 
         self.plot_func = {}
+        intersections_time = self.find_phases_intersections()
         for i, nlp in enumerate(self.ocp.nlp):
             for variable in self.variable_sizes[i]:
                 nb = max(nlp["plot"][variable].phase_mappings.map_idx) + 1
@@ -165,7 +166,6 @@ class PlotOcp:
                         raise RuntimeError(f"{plot_type} is not implemented yet")
 
             for ax in axes:
-                intersections_time = self.find_phases_intersections()
                 for time in intersections_time:
                     self.plots_vertical_lines.append(ax.axvline(time, linestyle="--", linewidth=1.2, c="k"))
 
@@ -195,8 +195,10 @@ class PlotOcp:
     def _organize_windows(self, nb_windows):
         self.nb_vertical_windows, self.nb_horizontal_windows = PlotOcp._generate_windows_size(nb_windows)
         if self.automatically_organize:
-            height = tkinter.Tk().winfo_screenheight()
-            width = tkinter.Tk().winfo_screenwidth()
+            root = tkinter.Tk()
+            height = root.winfo_screenheight()
+            width = root.winfo_screenwidth()
+            root.destroy()
             self.top_margin = height / 15
             self.height_step = (height - self.top_margin) / self.nb_horizontal_windows
             self.width_step = width / self.nb_vertical_windows
@@ -219,29 +221,30 @@ class PlotOcp:
             self.ocp, V, get_parameters=True, integrate=True, concatenate=False
         )
 
-        for _ in self.ocp.nlp:
-            if self.t_idx_to_optimize:
-                for i_in_time, i_in_tf in enumerate(self.t_idx_to_optimize):
-                    self.tf[i_in_tf] = data_param["time"][i_in_time]
-            self.__update_xdata()
+        # This does not depend on the phase, so the time vectors are updated only once
+        for i_in_time, i_in_tf in enumerate(self.t_idx_to_optimize):
+            self.tf[i_in_tf] = data_param["time"][i_in_time]
+        self.__update_xdata()
 
         data_states_per_phase, data_controls_per_phase = Data.get_data(self.ocp, V, concatenate=False)
         for i, nlp in enumerate(self.ocp.nlp):
-            state = np.ndarray((0, nlp["ns"] + 1))
+            # Each block is gathered first so the states and controls are allocated only once
+            state = [np.ndarray((0, nlp["ns"] + 1))]
             for s in nlp["var_states"]:
                 if isinstance(data_states_per_phase[s], (list, tuple)):
-                    state = np.concatenate((state, data_states_per_phase[s][i]))
+                    state.append(data_states_per_phase[s][i])
                 else:
-                    state = np.concatenate((state, data_states_per_phase[s]))
-            control = np.ndarray((0, nlp["ns"] + 1))
+                    state.append(data_states_per_phase[s])
+            state = np.concatenate(state)
+            control = [np.ndarray((0, nlp["ns"] + 1))]
             for s in nlp["var_controls"]:
                 if isinstance(data_controls_per_phase[s], (list, tuple)):
-                    control = np.concatenate((control, data_controls_per_phase[s][i]))
+                    control.append(data_controls_per_phase[s][i])
                 else:
-                    control = np.concatenate((control, data_controls_per_phase[s]))
+                    control.append(data_controls_per_phase[s])
+            control = np.concatenate(control)
             for key in self.variable_sizes[i]:
                 y = np.empty((self.variable_sizes[i][key], len(self.t[i])))
-                y.fill(np.nan)
                 y[:, :] = self.plot_func[key][i].function(state, control)
                 self.__append_to_ydata(y)
         self.__update_axes()
@@ -341,7 +344,7 @@ class ShowResult:
             all_bioviz[-1].load_movement(self.ocp.nlp[idx_phase]["q_mapping"].expand.map(data).T)
 
         b_is_visible = [True] * len(all_bioviz)
-        while sum(b_is_visible):
+        while any(b_is_visible):
             for i, b in enumerate(all_bioviz):
                 if b.vtk_window.is_active:
                     if b.show_analyses_panel and b.is_animating:
@@ -363,7 +366,6 @@ class OnlineCallback(Callback):
         Callback.__init__(self)
         self.nlp = ocp
         self.nx = ocp.V.rows()
-        self.ng = 0
         self.construct("AnimateCallback", opts)
 
         self.plot_pipe, plotter_pipe = mp.Pipe()
@@ -388,13 +390,10 @@ class OnlineCallback(Callback):
         return "ret"
 
     def get_sparsity_in(self, i):
-        n = nlpsol_out(i)
-        if n == "f":
-            return Sparsity.scalar()
-        elif n in ("x", "lam_x"):
+        # Only the optimized variables are plotted, the other outputs of the solver are declared empty
+        # so they are not copied to the callback at each iteration
+        if nlpsol_out(i) == "x":
             return Sparsity.dense(self.nx)
-        elif n in ("g", "lam_g"):
-            return Sparsity.dense(self.ng)
         else:
             return Sparsity(0, 0)
 
@@ -5,6 +5,9 @@ from .mapping import BidirectionalMapping, Mapping
 from .plot import CustomPlot
 from .enums import PlotType
 
+# Options given to CasADi to compile a function just-in-time with the shell compiler
+JIT_OPTIONS = {"jit": True, "compiler": "shell", "jit_options": {"flags": ["-O3"], "verbose": False}}
+
 
 class ProblemType:
     """
@@ -20,7 +23,10 @@ class ProblemType:
         """
         ProblemType.__configure_q_qdot(nlp, True, False)
         ProblemType.__configure_tau(nlp, False, True)
-        ProblemType.__configure_forward_dyn_func(nlp, Dynamics.forward_dynamics_torque_driven)
+        if "external_forces" in nlp:
+            ProblemType.__configure_forward_dyn_func(nlp, Dynamics.forward_dynamics_torque_driven_with_external_forces)
+        else:
+            ProblemType.__configure_forward_dyn_func(nlp, Dynamics.forward_dynamics_torque_driven)
 
     @staticmethod
     def torque_driven_with_contact(nlp):
@@ -69,9 +75,7 @@ class ProblemType:
         ProblemType.__configure_q_qdot(nlp, True, False)
         ProblemType.__configure_muscles(nlp, False, True)
 
-        u = MX()
-        for i in range(nlp["nbMuscle"]):
-            u = vertcat(u, MX.sym(f"Muscle_{nlp['muscleNames']}_activation"))
+        u = vertcat(*[MX.sym(f"Muscle_{name}_activation") for name in nlp["muscleNames"]])
         nlp["u"] = vertcat(nlp["u"], u)
         nlp["var_controls"] = {"muscles": nlp["nbMuscle"]}
 
@@ -88,9 +92,7 @@ class ProblemType:
         ProblemType.__configure_tau(nlp, False, True)
         ProblemType.__configure_muscles(nlp, False, True)
 
-        u = MX()
-        for i in range(nlp["nbMuscle"]):
-            u = vertcat(u, MX.sym(f"Muscle_{nlp['muscleNames']}_activation"))
+        u = vertcat(*[MX.sym(f"Muscle_{name}_activation") for name in nlp["muscleNames"]])
         nlp["u"] = vertcat(nlp["u"], u)
         nlp["nu"] = nlp["u"].rows()
         nlp["var_controls"]["muscles"] = nlp["nbMuscle"]
@@ -106,11 +108,8 @@ class ProblemType:
         ProblemType.__configure_q_qdot(nlp, True, False)
         ProblemType.__configure_muscles(nlp, True, True)
 
-        u = MX()
-        x = MX()
-        for i in range(nlp["nbMuscle"]):
-            u = vertcat(u, MX.sym(f"Muscle_{nlp['muscleNames']}_excitation"))
-            x = vertcat(x, MX.sym(f"Muscle_{nlp['muscleNames']}_activation"))
+        u = vertcat(*[MX.sym(f"Muscle_{name}_excitation") for name in nlp["muscleNames"]])
+        x = vertcat(*[MX.sym(f"Muscle_{name}_activation") for name in nlp["muscleNames"]])
         nlp["u"] = vertcat(nlp["u"], u)
         nlp["x"] = vertcat(nlp["x"], x)
         nlp["var_states"]["muscles"] = nlp["nbMuscle"]
@@ -129,11 +128,8 @@ class ProblemType:
         ProblemType.__configure_tau(nlp, False, True)
         ProblemType.__configure_muscles(nlp, True, True)
 
-        u = MX()
-        x = MX()
-        for i in range(nlp["nbMuscle"]):
-            u = vertcat(u, MX.sym(f"Muscle_{nlp['muscleNames']}_excitation"))
-            x = vertcat(x, MX.sym(f"Muscle_{nlp['muscleNames']}_activation"))
+        u = vertcat(*[MX.sym(f"Muscle_{name}_excitation") for name in nlp["muscleNames"]])
+        x = vertcat(*[MX.sym(f"Muscle_{name}_activation") for name in nlp["muscleNames"]])
         nlp["u"] = vertcat(nlp["u"], u)
         nlp["x"] = vertcat(nlp["x"], x)
         nlp["var_states"]["muscles"] = nlp["nbMuscle"]
@@ -152,9 +148,7 @@ class ProblemType:
         ProblemType.__configure_tau(nlp, False, True)
         ProblemType.__configure_muscles(nlp, False, True)
 
-        u = MX()
-        for i in range(nlp["nbMuscle"]):
-            u = vertcat(u, MX.sym(f"Muscle_{nlp['muscleNames']}_activation"))
+        u = vertcat(*[MX.sym(f"Muscle_{name}_activation") for name in nlp["muscleNames"]])
         nlp["u"] = vertcat(nlp["u"], u)
         nlp["var_controls"]["muscles"] = nlp["nbMuscle"]
 
@@ -176,11 +170,8 @@ class ProblemType:
         ProblemType.__configure_tau(nlp, False, True)
         ProblemType.__configure_muscles(nlp, True, True)
 
-        u = MX()
-        x = MX()
-        for i in range(nlp["nbMuscle"]):
-            u = vertcat(u, MX.sym(f"Muscle_{nlp['muscleNames']}_excitation"))
-            x = vertcat(x, MX.sym(f"Muscle_{nlp['muscleNames']}_activation"))
+        u = vertcat(*[MX.sym(f"Muscle_{name}_excitation") for name in nlp["muscleNames"]])
+        x = vertcat(*[MX.sym(f"Muscle_{name}_activation") for name in nlp["muscleNames"]])
         nlp["u"] = vertcat(nlp["u"], u)
         nlp["x"] = vertcat(nlp["x"], x)
         nlp["var_states"]["muscles"] = nlp["nbMuscle"]
@@ -209,27 +200,24 @@ class ProblemType:
             )
 
         dof_names = nlp["model"].nameDof()
-        q = MX()
-        q_dot = MX()
-        for i in nlp["q_mapping"].reduce.map_idx:
-            q = vertcat(q, MX.sym("Q_" + dof_names[i].to_string(), 1, 1))
-        for i in nlp["q_dot_mapping"].reduce.map_idx:
-            q_dot = vertcat(q_dot, MX.sym("Qdot_" + dof_names[i].to_string(), 1, 1))
+        q = vertcat(*[MX.sym("Q_" + dof_names[i].to_string(), 1, 1) for i in nlp["q_mapping"].reduce.map_idx])
+        q_dot = vertcat(
+            *[MX.sym("Qdot_" + dof_names[i].to_string(), 1, 1) for i in nlp["q_dot_mapping"].reduce.map_idx]
+        )
 
         nlp["nbQ"] = nlp["q_mapping"].reduce.len
         nlp["nbQdot"] = nlp["q_dot_mapping"].reduce.len
 
-        legend_q = ["q_" + nlp["model"].nameDof()[idx].to_string() for idx in nlp["q_mapping"].reduce.map_idx]
-        legend_qdot = ["qdot_" + nlp["model"].nameDof()[idx].to_string() for idx in nlp["q_dot_mapping"].reduce.map_idx]
+        legend_q = ["q_" + dof_names[idx].to_string() for idx in nlp["q_mapping"].reduce.map_idx]
+        legend_qdot = ["qdot_" + dof_names[idx].to_string() for idx in nlp["q_dot_mapping"].reduce.map_idx]
 
         if as_states:
             nlp["x"] = vertcat(q, q_dot)
             nlp["var_states"] = {"q": nlp["nbQ"], "q_dot": nlp["nbQdot"]}
-            nlp["plot"]["q"] = CustomPlot(lambda x, u: x[: nlp["nbQ"]], plot_type=PlotType.INTEGRATED, legend=legend_q)
+            nb_q, nb_qdot = nlp["nbQ"], nlp["nbQdot"]
+            nlp["plot"]["q"] = CustomPlot(lambda x, u: x[:nb_q], plot_type=PlotType.INTEGRATED, legend=legend_q)
             nlp["plot"]["q_dot"] = CustomPlot(
-                lambda x, u: x[nlp["nbQ"] : nlp["nbQ"] + nlp["nbQdot"]],
-                plot_type=PlotType.INTEGRATED,
-                legend=legend_qdot,
+                lambda x, u: x[nb_q : nb_q + nb_qdot], plot_type=PlotType.INTEGRATED, legend=legend_qdot,
             )
         if as_controls:
             nlp["u"] = vertcat(q, q_dot)
@@ -248,12 +236,10 @@ class ProblemType:
             )
 
         dof_names = nlp["model"].nameDof()
-        u = MX()
-        for i in nlp["tau_mapping"].reduce.map_idx:
-            u = vertcat(u, MX.sym("Tau_" + dof_names[i].to_string(), 1, 1))
+        u = vertcat(*[MX.sym("Tau_" + dof_names[i].to_string(), 1, 1) for i in nlp["tau_mapping"].reduce.map_idx])
 
         nlp["nbTau"] = nlp["tau_mapping"].reduce.len
-        legend_tau = ["tau_" + nlp["model"].nameDof()[idx].to_string() for idx in nlp["tau_mapping"].reduce.map_idx]
+        legend_tau = ["tau_" + dof_names[idx].to_string() for idx in nlp["tau_mapping"].reduce.map_idx]
 
         if as_states:
             nlp["x"] = u
@@ -262,7 +248,8 @@ class ProblemType:
         if as_controls:
             nlp["u"] = u
             nlp["var_controls"] = {"tau": nlp["nbTau"]}
-            nlp["plot"]["tau"] = CustomPlot(lambda x, u: u[: nlp["nbTau"]], plot_type=PlotType.STEP, legend=legend_tau)
+            nb_tau = nlp["nbTau"]
+            nlp["plot"]["tau"] = CustomPlot(lambda x, u: u[:nb_tau], plot_type=PlotType.STEP, legend=legend_tau)
 
     @staticmethod
     def __configure_contact(nlp, dyn_func):
@@ -288,19 +275,21 @@ class ProblemType:
         nlp["nbMuscle"] = nlp["model"].nbMuscles()
         nlp["muscleNames"] = [names.to_string() for names in nlp["model"].muscleNames()]
 
+        nb_muscle = nlp["nbMuscle"]
         combine = None
         if as_states:
             nx_q = nlp["nbQ"] + nlp["nbQdot"]
             nlp["plot"]["muscles_states"] = CustomPlot(
-                lambda x, u: x[nx_q : nx_q + nlp["nbMuscle"]],
+                lambda x, u: x[nx_q : nx_q + nb_muscle],
                 plot_type=PlotType.INTEGRATED,
                 legend=nlp["muscleNames"],
                 ylim=[0, 1],
             )
             combine = "muscles_states"
         if as_controls:
+            nb_tau = nlp["nbTau"]
             nlp["plot"]["muscles_control"] = CustomPlot(
-                lambda x, u: u[nlp["nbTau"] : nlp["nbTau"] + nlp["nbMuscle"]],
+                lambda x, u: u[nb_tau : nb_tau + nb_muscle],
                 plot_type=PlotType.STEP,
                 legend=nlp["muscleNames"],
                 combine_to=combine,
@@ -312,6 +301,8 @@ class ProblemType:
         nlp["nu"] = nlp["u"].rows()
         nlp["nx"] = nlp["x"].rows()
 
+        expand_options = JIT_OPTIONS if nlp.get("use_jit_dynamics", False) else {}
+
         symbolic_states = MX.sym("x", nlp["nx"], 1)
         symbolic_controls = MX.sym("u", nlp["nu"], 1)
         nlp["dynamics_func"] = Function(
@@ -320,4 +311,4 @@ class ProblemType:
             [dyn_func(symbolic_states, symbolic_controls, nlp)],
             ["x", "u"],
             ["xdot"],
-        ).expand()  # .map(nlp["ns"], "thread", 2)
+        ).expand("ForwardDyn", expand_options)
@@ -28,15 +28,15 @@ class Data:
 
             range_idx = range(self.nb_elements) if idx == () else idx
 
-            data = np.ndarray((len(range_idx), 0))
+            data = [np.ndarray((len(range_idx), 0))]
             for idx_phase in range_phases:
                 if idx_phase < range_phases[-1]:
                     range_nodes = range(self.phase[idx_phase].nb_t - 1) if node_idx == () else node_idx
                 else:
                     range_nodes = range(self.phase[idx_phase].nb_t) if node_idx == () else node_idx
                 for idx_node in range_nodes:
-                    node = self.phase[idx_phase].node[idx_node][range_idx, :]
-                    data = np.concatenate((data, node), axis=1)
+                    data.append(self.phase[idx_phase].node[idx_node][range_idx, :])
+            data = np.concatenate(data, axis=1)
         else:
             data = [
                 self.to_matrix(idx=idx, phase_idx=phase, node_idx=node_idx, concatenate_phases=False)
@@ -109,7 +109,7 @@ class Data:
 
     @staticmethod
     def get_data_object(ocp, V, phase_idx=None, integrate=False, interpolate_nb_frames=-1, concatenate=True):
-        V_array = np.array(V).squeeze()
+        V_array = np.asarray(V).squeeze()
 
         if phase_idx is None:
             phase_idx = range(len(ocp.nlp))
@@ -130,29 +130,30 @@ class Data:
                 if key not in data_controls.keys():
                     data_controls[key] = Data()
 
-            V_phase = np.array(V_array[offsets[i] : offsets[i + 1]])
-            nb_var = nlp["nx"] + nlp["nu"]
+            V_phase = V_array[offsets[i] : offsets[i + 1]]
+            # V is ordered node by node (x_0, u_0, ..., x_ns), padding the missing u_ns allows to reshape it by node.
+            # This is done once per phase, each variable then being a slice of it
+            V_nodes = np.concatenate((V_phase, np.zeros(nlp["nu"]))).reshape(nlp["ns"] + 1, nlp["nx"] + nlp["nu"])
+            phase_time = Data._get_phase_time(V_phase, nlp)
             offset = 0
 
             for key in nlp["var_states"]:
                 data_states[key]._append_phase(
-                    (Data._get_phase_time(V_phase, nlp)),
-                    Data._get_phase(V_phase, nlp["var_states"][key], nlp["ns"] + 1, offset, nb_var, False),
+                    phase_time, Data._get_phase(V_nodes, nlp["var_states"][key], nlp["ns"] + 1, offset, False),
                 )
                 offset += nlp["var_states"][key]
 
             for key in nlp["var_controls"]:
                 data_controls[key]._append_phase(
-                    (Data._get_phase_time(V_phase, nlp)),
-                    Data._get_phase(V_phase, nlp["var_controls"][key], nlp["ns"], offset, nb_var, True),
+                    phase_time, Data._get_phase(V_nodes, nlp["var_controls"][key], nlp["ns"], offset, True),
                 )
                 offset += nlp["var_controls"][key]
 
-        offset = sum([nlp["nx"] * (nlp["ns"] + 1) + nlp["nu"] * nlp["ns"] for nlp in ocp.nlp])
-        for key in ocp.param_to_optimize:
-            if ocp.param_to_optimize[key]:
-                nb_param = len(ocp.param_to_optimize[key])
-                data_parameters[key] = np.array(V[offset : offset + nb_param])
+        offset = offsets[-1]
+        for key, param in ocp.param_to_optimize.items():
+            if param:
+                nb_param = len(param)
+                data_parameters[key] = np.array(V_array[offset : offset + nb_param, np.newaxis])
                 offset += nb_param
 
                 if key == "time":
@@ -200,21 +201,26 @@ class Data:
         for idx_phase in range(ocp.nb_phases):
             dt = ocp.nlp[idx_phase]["dt"]
             nlp = ocp.nlp[idx_phase]
+            states_keys = list(nlp["var_states"].keys())
+            controls_keys = list(nlp["var_controls"].keys())
             for idx_node in reversed(range(ocp.nlp[idx_phase]["ns"])):
-                x0 = Data._vertcat(data_states, list(nlp["var_states"].keys()), idx_phase, idx_node)
-                p = Data._vertcat(data_controls, list(nlp["var_controls"].keys()), idx_phase, idx_node)
+                x0 = Data._vertcat(data_states, states_keys, idx_phase, idx_node)
                 if time_is_optimized:
                     # TODO: Allow integrate when optimizing time
                     xf_dof = x0
                 else:
+                    p = Data._vertcat(data_controls, controls_keys, idx_phase, idx_node)
                     xf_dof = np.array(ocp.nlp[idx_phase]["dynamics"][idx_node](x0=x0, p=p)["xf"])  # Integrate
 
                 offset = 0
                 for key in nlp["var_states"]:
                     data_states[key]._horzcat_node(
-                        dt, xf_dof[offset : offset + nlp["var_states"][key]], idx_phase, idx_node
+                        xf_dof[offset : offset + nlp["var_states"][key]], idx_phase, idx_node
                     )
                     offset += nlp["var_states"][key]
+
+            for key in nlp["var_states"]:
+                data_states[key]._add_integrated_time(dt, idx_phase)
         return data_states
 
     @staticmethod
@@ -242,33 +248,27 @@ class Data:
                 t_int = np.linspace(t_phase[0], t_phase[-1], nb_frames)
                 x_phase = d[idx_phase]
 
-                x_interpolate = np.ndarray((data_states[key].nb_elements, nb_frames))
-                for j in range(data_states[key].nb_elements):
-                    s = interpolate.splrep(t_phase, x_phase[j, :])
-                    x_interpolate[j, :] = interpolate.splev(t_int, s)
+                # Same not-a-knot cubic spline as splrep/splev, fitted on all the elements at once
+                x_interpolate = interpolate.make_interp_spline(t_phase, x_phase, axis=1)(t_int)
                 data_states[key].phase[idx_phase] = Data.Phase(t_int, x_interpolate)
 
         return data_states
 
-    def _horzcat_node(self, dt, x_to_add, idx_phase, idx_node):
-        self.phase[idx_phase].t = np.concatenate(
-            (
-                self.phase[idx_phase].t[: idx_node + 1],
-                [self.phase[idx_phase].t[idx_node] + dt],
-                self.phase[idx_phase].t[idx_node + 1 :],
-            )
-        )
+    def _horzcat_node(self, x_to_add, idx_phase, idx_node):
         self.phase[idx_phase].node[idx_node] = np.concatenate((self.phase[idx_phase].node[idx_node], x_to_add), axis=1)
 
+    def _add_integrated_time(self, dt, idx_phase):
+        # Every node but the last is followed by its integrated state, so the time vector is interleaved at once
+        t = self.phase[idx_phase].t
+        self.phase[idx_phase].t = np.append(np.vstack((t[:-1], t[:-1] + dt)).T.ravel(), t[-1])
+
     @staticmethod
-    def _get_phase(V_phase, var_size, nb_nodes, offset, nb_variables, duplicate_last_column):
+    def _get_phase(V_nodes, var_size, nb_nodes, offset, duplicate_last_column):
         """
         Extracts variables from V.
-        :param V_phase: numpy array : Extract of V for a phase.
+        :param V_nodes: numpy array : Extract of V for a phase, reshaped to one row per node.
         """
-        array = np.ndarray((var_size, nb_nodes))
-        for dof in range(var_size):
-            array[dof, :] = V_phase[offset + dof :: nb_variables]
+        array = V_nodes[:nb_nodes, offset : offset + var_size].T
 
         if duplicate_last_column:
             return np.c_[array, array[:, -1]]
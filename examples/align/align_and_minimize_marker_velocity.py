@@ -66,18 +66,14 @@ def prepare_ocp(
     # Path constraint
     X_bounds = QAndQDotBounds(biorbd_model)
 
-    for i in range(nq, 2 * nq):
-        X_bounds.min[i, :] = -10
-        X_bounds.max[i, :] = 10
+    X_bounds.min[nq : 2 * nq, :] = -10
+    X_bounds.max[nq : 2 * nq, :] = 10
 
     # Initial guess
     X_init = InitialConditions([0] * (biorbd_model.nbQ() + biorbd_model.nbQdot()))
-    for i in range(2):
-        X_init.init[i] = 1.5
-    for i in range(4, 6):
-        X_init.init[i] = 0.7
-    for i in range(6, 8):
-        X_init.init[i] = 0.6
+    X_init.init[0:2] = 1.5
+    X_init.init[4:6] = 0.7
+    X_init.init[6:8] = 0.6
 
     # Define control path constraint
     U_bounds = Bounds(
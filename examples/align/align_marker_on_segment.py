@@ -45,22 +45,19 @@ def prepare_ocp(biorbd_model_path, final_time, number_shooting_points, ode_solve
     # Path constraint
     X_bounds = QAndQDotBounds(biorbd_model)
 
-    for i in range(1, 8):
-        if i != 3:
-            X_bounds.min[i, [0, -1]] = 0
-            X_bounds.max[i, [0, -1]] = 0
+    X_bounds.min[[1, 2, 4, 5, 6, 7], 0] = 0
+    X_bounds.max[[1, 2, 4, 5, 6, 7], 0] = 0
+    X_bounds.min[[1, 2, 4, 5, 6, 7], -1] = 0
+    X_bounds.max[[1, 2, 4, 5, 6, 7], -1] = 0
     X_bounds.min[2, -1] = 1.57
     X_bounds.max[2, -1] = 1.57
 
     # Initial guess
     X_init = InitialConditions([0] * (biorbd_model.nbQ() + biorbd_model.nbQdot()))
     if initialize_near_solution:
-        for i in range(2):
-            X_init.init[i] = 1.5
-        for i in range(4, 6):
-            X_init.init[i] = 0.7
-        for i in range(6, 8):
-            X_init.init[i] = 0.6
+        X_init.init[0:2] = 1.5
+        X_init.init[4:6] = 0.7
+        X_init.init[6:8] = 0.6
 
     # Define control path constraint
     U_bounds = Bounds(
@@ -1,4 +1,5 @@
 import biorbd
+import numpy as np
 import pickle
 from time import time
 
@@ -9,10 +10,13 @@ from biorbd_optim import (
     QAndQDotBounds,
     InitialConditions,
     ShowResult,
+    OdeSolver,
 )
 
 
-def prepare_ocp(biorbd_model_path, final_time, number_shooting_points, nb_threads):
+def prepare_ocp(
+    biorbd_model_path, final_time, number_shooting_points, nb_threads, ode_solver=OdeSolver.RK, use_jit_dynamics=False
+):
     # --- Options --- #
     biorbd_model = biorbd.Model(biorbd_model_path)
     torque_min, torque_max, torque_init = -100, 100, 0
@@ -37,14 +41,14 @@ def prepare_ocp(biorbd_model_path, final_time, number_shooting_points, nb_thread
     X_bounds.max[1, -1] = 3.14
 
     # Initial guess
-    X_init = InitialConditions([0] * (n_q + n_qdot))
+    X_init = InitialConditions(np.zeros(n_q + n_qdot))
 
     # Define control path constraint
-    U_bounds = Bounds(min_bound=[torque_min] * n_tau, max_bound=[torque_max] * n_tau)
+    U_bounds = Bounds(min_bound=np.full(n_tau, torque_min), max_bound=np.full(n_tau, torque_max))
     U_bounds.min[n_tau - 1, :] = 0
     U_bounds.max[n_tau - 1, :] = 0
 
-    U_init = InitialConditions([torque_init] * n_tau)
+    U_init = InitialConditions(np.full(n_tau, torque_init))
 
     # ------------- #
 
@@ -59,7 +63,9 @@ def prepare_ocp(biorbd_model_path, final_time, number_shooting_points, nb_thread
         U_bounds,
         objective_functions,
         constraints,
+        ode_solver=ode_solver,
         nb_threads=nb_threads,
+        use_jit_dynamics=use_jit_dynamics,
     )
 
 
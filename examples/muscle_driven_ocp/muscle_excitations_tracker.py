@@ -41,17 +41,9 @@ def generate_data(biorbd_model, final_time, nb_shooting):
         "q_dot_mapping": BidirectionalMapping(Mapping(range(nb_qdot)), Mapping(range(nb_qdot))),
         "tau_mapping": BidirectionalMapping(Mapping(range(nb_tau)), Mapping(range(nb_tau))),
     }
-    markers_func = []
-    for i in range(nb_markers):
-        markers_func.append(
-            Function(
-                "ForwardKin",
-                [symbolic_states],
-                [biorbd_model.marker(symbolic_states[:nb_q], i).to_mx()],
-                ["q"],
-                ["marker_" + str(i)],
-            ).expand()
-        )
+    markers_func = Function(
+        "ForwardKin", [symbolic_states], [biorbd_model.markers(symbolic_states[:nb_q])], ["q"], ["markers"],
+    ).expand()
     dynamics_func = Function(
         "ForwardDyn",
         [symbolic_states, symbolic_controls],
@@ -61,7 +53,6 @@ def generate_data(biorbd_model, final_time, nb_shooting):
     ).expand()
 
     def dyn_interface(t, x, u):
-        u = np.concatenate([np.zeros(nb_tau), u])
         return np.array(dynamics_func(x, u)).squeeze()
 
     # Generate some muscle excitations
@@ -69,16 +60,17 @@ def generate_data(biorbd_model, final_time, nb_shooting):
 
     # Integrate and collect the position of the markers accordingly
     X = np.ndarray((nb_q + nb_qdot + nb_mus, nb_shooting + 1))
-    markers = np.ndarray((3, biorbd_model.nbMarkers(), nb_shooting + 1))
+    markers = np.ndarray((3, nb_markers, nb_shooting + 1))
 
     def add_to_data(i, q):
         X[:, i] = q
-        for j, mark_func in enumerate(markers_func):
-            markers[:, j, i] = np.array(mark_func(q)).squeeze()
+        markers[:, :, i] = markers_func(q)
 
-    x_init = np.array([0] * nb_q + [0] * nb_qdot + [0.5] * nb_mus)
+    x_init = np.concatenate((np.zeros(nb_q + nb_qdot), np.full(nb_mus, 0.5)))
     add_to_data(0, x_init)
     for i, u in enumerate(U):
+        # The residual torques are added once per interval instead of at each evaluation of the dynamics
+        u = np.concatenate([np.zeros(nb_tau), u])
         sol = solve_ivp(dyn_interface, (0, dt), x_init, method="RK45", args=(u,))
         x_init = sol["y"][:, -1]
         add_to_data(i + 1, x_init)
@@ -96,6 +88,7 @@ def prepare_ocp(
     q_ref,
     use_residual_torque,
     kin_data_to_track="markers",
+    nb_threads=1,
 ):
     # Problem parameters
     torque_min, torque_max, torque_init = -100, 100, 0
@@ -172,6 +165,7 @@ def prepare_ocp(
         U_bounds,
         objective_functions,
         constraints,
+        nb_threads=nb_threads,
     )
 
 
@@ -197,6 +191,7 @@ if __name__ == "__main__":
         x_ref[: biorbd_model.nbQ(), :].T,
         use_residual_torque=use_residual_torque,
         kin_data_to_track="q",
+        nb_threads=4,
     )
 
     # --- Solve the program --- #
@@ -218,18 +213,17 @@ if __name__ == "__main__":
     n_mark = ocp.nlp[0]["model"].nbMarkers()
     n_frames = q.shape[1]
 
-    markers = np.ndarray((3, n_mark, q.shape[1]))
     symbolic_states = MX.sym("x", n_q, 1)
     markers_func = Function(
         "ForwardKin", [symbolic_states], [biorbd_model.markers(symbolic_states)], ["q"], ["markers"],
     ).expand()
-    for i in range(n_frames):
-        markers[:, :, i] = markers_func(q[:, i])
+    # All the frames are evaluated in one call, the markers of each frame being returned side by side
+    markers = np.array(markers_func.map(n_frames)(q)).reshape((3, n_frames, n_mark)).transpose((0, 2, 1))
 
     plt.figure("Markers")
-    for i in range(markers.shape[1]):
-        plt.plot(np.linspace(0, 2, n_shooting_points + 1), markers_ref[:, i, :].T, "k")
-        plt.plot(np.linspace(0, 2, n_shooting_points + 1), markers[:, i, :].T, "r--")
+    # Every coordinate of every marker is a column, so each set of markers is drawn in a single call
+    plt.plot(t, markers_ref.reshape((-1, markers_ref.shape[2])).T, "k")
+    plt.plot(t, markers.reshape((-1, markers.shape[2])).T, "r--")
     plt.xlabel("Time")
     plt.ylabel("Markers Position")
 
@@ -12,7 +12,7 @@ from biorbd_optim import (
 )
 
 
-def prepare_ocp(biorbd_model_path, final_time, number_shooting_points):
+def prepare_ocp(biorbd_model_path, final_time, number_shooting_points, nb_threads=1):
     # --- Options --- #
     biorbd_model = biorbd.Model(biorbd_model_path)
     torque_min, torque_max, torque_init = -100, 100, 0
@@ -59,6 +59,7 @@ def prepare_ocp(biorbd_model_path, final_time, number_shooting_points):
         U_bounds,
         objective_functions,
         constraints,
+        nb_threads=nb_threads,
     )
 
 
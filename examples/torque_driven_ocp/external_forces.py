@@ -39,9 +39,10 @@ def prepare_ocp(biorbd_model_path="cube_with_forces.bioMod", ode_solver=OdeSolve
     )
 
     # External forces
+    # The forces are the same at each node, so they are broadcast along the nodes instead of being copied
     external_forces = [
-        np.repeat(
-            np.array([[0, 0, 0, 0, 0, -2], [0, 0, 0, 0, 0, 5]]).T[:, :, np.newaxis], number_shooting_points, axis=2
+        np.broadcast_to(
+            np.array([[0, 0, 0, 0, 0, -2], [0, 0, 0, 0, 0, 5]]).T[:, :, np.newaxis], (6, 2, number_shooting_points)
         )
     ]
 
@@ -6,6 +6,7 @@ from pathlib import Path
 
 import pytest
 import numpy as np
+import casadi
 
 from biorbd_optim import (
     Data,
@@ -63,6 +64,129 @@ def test_pendulum(nb_threads):
     TestUtils.save_and_load(sol, ocp, True)
 
 
+@pytest.mark.parametrize("nb_threads", [1, 2])
+def test_pendulum_collocation(nb_threads):
+    # Load pendulum
+    PROJECT_FOLDER = Path(__file__).parent / ".."
+    spec = importlib.util.spec_from_file_location(
+        "pendulum", str(PROJECT_FOLDER) + "/examples/getting_started/pendulum.py"
+    )
+    pendulum = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(pendulum)
+
+    ocp = pendulum.prepare_ocp(
+        biorbd_model_path=str(PROJECT_FOLDER) + "/examples/getting_started/pendulum.bioMod",
+        final_time=2,
+        number_shooting_points=10,
+        nb_threads=nb_threads,
+        ode_solver=OdeSolver.COLLOCATION,
+    )
+    sol = ocp.solve()
+
+    # Check objective function value
+    f = np.array(sol["f"])
+    np.testing.assert_equal(f.shape, (1, 1))
+    np.testing.assert_almost_equal(f[0, 0], 0.0)
+
+    # Check constraints
+    g = np.array(sol["g"])
+    np.testing.assert_equal(g.shape, (40, 1))
+    np.testing.assert_almost_equal(g, np.zeros((40, 1)))
+
+    # Check some of the results
+    states, controls = Data.get_data(ocp, sol["x"])
+    q, qdot = states["q"], states["q_dot"]
+
+    # initial and final position
+    np.testing.assert_almost_equal(q[:, 0], np.array((0, 0)))
+    np.testing.assert_almost_equal(q[:, -1], np.array((0, 3.14)))
+
+    # initial and final velocities
+    np.testing.assert_almost_equal(qdot[:, 0], np.array((0, 0)))
+    np.testing.assert_almost_equal(qdot[:, -1], np.array((0, 0)))
+
+
+def test_pendulum_jit_dynamics():
+    # Load pendulum
+    PROJECT_FOLDER = Path(__file__).parent / ".."
+    spec = importlib.util.spec_from_file_location(
+        "pendulum", str(PROJECT_FOLDER) + "/examples/getting_started/pendulum.py"
+    )
+    pendulum = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(pendulum)
+
+    ocp = pendulum.prepare_ocp(
+        biorbd_model_path=str(PROJECT_FOLDER) + "/examples/getting_started/pendulum.bioMod",
+        final_time=2,
+        number_shooting_points=10,
+        nb_threads=1,
+        use_jit_dynamics=True,
+    )
+
+    # The integrator must call the compiled dynamics instead of inlining it
+    integrator = ocp.nlp[0]["dynamics"][0]
+    called_functions = [
+        integrator.instruction_MX(i).which_function().name()
+        for i in range(integrator.n_instructions())
+        if integrator.instruction_id(i) == casadi.OP_CALL
+    ]
+    assert "ForwardDyn" in called_functions
+
+    sol = ocp.solve()
+
+    # Check objective function value
+    f = np.array(sol["f"])
+    np.testing.assert_equal(f.shape, (1, 1))
+    np.testing.assert_almost_equal(f[0, 0], 0.0)
+
+    # Check constraints
+    g = np.array(sol["g"])
+    np.testing.assert_equal(g.shape, (40, 1))
+    np.testing.assert_almost_equal(g, np.zeros((40, 1)))
+
+    # Check some of the results
+    states, controls = Data.get_data(ocp, sol["x"])
+    tau = controls["tau"]
+
+    # initial and final controls
+    np.testing.assert_almost_equal(tau[:, 0], np.array((17.4928172, 0)))
+    np.testing.assert_almost_equal(tau[:, -1], np.array((-24.2842703, 0)))
+
+
+def test_custom_constraint_warm_start():
+    PROJECT_FOLDER = Path(__file__).parent / ".."
+    spec = importlib.util.spec_from_file_location(
+        "custom_constraint", str(PROJECT_FOLDER) + "/examples/getting_started/custom_constraint.py"
+    )
+    custom_constraint = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(custom_constraint)
+
+    ocp = custom_constraint.prepare_ocp(
+        biorbd_model_path=str(PROJECT_FOLDER) + "/examples/getting_started/cube.bioMod", ode_solver=OdeSolver.RK
+    )
+    sol = ocp.solve()
+    np.testing.assert_almost_equal(np.array(sol["f"])[0, 0], 19767.533125695223)
+
+    # Started from the previous solution, no iteration is needed: the solver returns the starting point,
+    # which is only the solution if the variables and the multipliers were passed through
+    sol_warm_start = ocp.solve(options_ipopt={"max_iter": 0}, warm_start=sol)
+
+    # Check objective function value
+    f = np.array(sol_warm_start["f"])
+    np.testing.assert_equal(f.shape, (1, 1))
+    np.testing.assert_almost_equal(f[0, 0], np.array(sol["f"])[0, 0])
+
+    # Check constraints
+    g = np.array(sol_warm_start["g"])
+    np.testing.assert_equal(g.shape, (186, 1))
+    np.testing.assert_almost_equal(g, np.zeros((186, 1)))
+
+    # Check the variables and the multipliers
+    np.testing.assert_almost_equal(np.array(sol_warm_start["x"]), np.array(sol["x"]))
+    np.testing.assert_almost_equal(np.array(sol_warm_start["lam_x"]), np.array(sol["lam_x"]))
+    np.testing.assert_almost_equal(np.array(sol_warm_start["lam_g"]), np.array(sol["lam_g"]))
+
+
 @pytest.mark.parametrize("ode_solver", [OdeSolver.RK])
 def test_custom_constraint_align_markers(ode_solver):
     PROJECT_FOLDER = Path(__file__).parent / ".."
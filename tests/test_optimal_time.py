@@ -25,7 +25,10 @@ def test_pendulum_min_time_mayer(ode_solver):
         biorbd_model_path=str(PROJECT_FOLDER) + "/examples/optimal_time_ocp/pendulum.bioMod",
         final_time=2,
         number_shooting_points=10,
+        nb_threads=1,
     )
+    # The time is optimized, so the continuity is integrated node by node instead of through a map
+    assert ocp.nlp[0]["par_dynamics"] is None
     sol = ocp.solve()
 
     # Check objective function value
@@ -0,0 +1,35 @@
+"""
+Test for the evaluation of the path conditions
+"""
+import pytest
+import numpy as np
+
+from biorbd_optim import Bounds, InterpolationType
+
+
+@pytest.mark.parametrize("interpolation_type", InterpolationType)
+def test_evaluate_at_all_matches_evaluate_at(interpolation_type):
+    nb_elements, nb_shooting = 3, 5
+    if interpolation_type == InterpolationType.CONSTANT:
+        nb_columns = 1
+    elif interpolation_type == InterpolationType.CONSTANT_WITH_FIRST_AND_LAST_DIFFERENT:
+        nb_columns = 3
+    elif interpolation_type == InterpolationType.LINEAR:
+        nb_columns = 2
+    else:
+        nb_columns = nb_shooting + 1
+
+    np.random.seed(42)
+    bounds = Bounds(
+        np.random.random((nb_elements, nb_columns)),
+        np.random.random((nb_elements, nb_columns)),
+        interpolation_type=interpolation_type,
+    )
+    bounds.check_and_adjust_dimensions(nb_elements, nb_shooting)
+
+    # Both evaluations must give the same values at every shooting point
+    for condition in (bounds.min, bounds.max):
+        all_points = condition.evaluate_at_all(nb_shooting + 1)
+        np.testing.assert_equal(all_points.shape, (nb_elements, nb_shooting + 1))
+        for k in range(nb_shooting + 1):
+            np.testing.assert_almost_equal(all_points[:, k], condition.evaluate_at(shooting_point=k))
@@ -50,7 +50,10 @@ class TestUtils:
         if isinstance(first_elem, dict):
             for key in first_elem:
                 TestUtils.deep_assert(first_elem[key], second_elem[key])
-        elif isinstance(first_elem, (list, tuple)):
+        elif isinstance(first_elem, (list, tuple)) and not all(
+            isinstance(elem, (int, float, np.number)) for elem in first_elem
+        ):
+            # Lists of numbers are compared as a whole below
             for i in range(len(first_elem)):
                 TestUtils.deep_assert(first_elem[i], second_elem[i])
         elif isinstance(